@@ -0,0 +1,79 @@
+"""키워드 매칭 벤치마크: 기존 부분 문자열 스캔 vs Aho-Corasick 오토마톤.
+
+사용법: python benchmarks/bench_keyword_matching.py [--texts 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Iterable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotdeal_telegram_bot import KeywordMatcher  # noqa: E402
+
+KEYWORD_COUNTS = (10, 1_000, 10_000)
+SYLLABLES = "가나다라마바사아자차카타파하특가대란오류배송무료쿠팡지마켓"
+WORDS = ["RTX", "4070", "SSD", "1TB", "에어팟", "맥북", "노트북", "모니터", "치킨", "쿠폰", "무료배송", "₩12,900"]
+
+
+def naive_matched_keywords(keywords: Iterable[str], text: str) -> List[str]:
+    # 오토마톤 도입 전 KeywordManager.matched_keywords의 부분 문자열 검색 구현 (비교 기준)
+    text_lower = text.lower()
+    return [k for k in sorted(keywords) if k.lower() in text_lower]
+
+
+def make_keywords(count: int, rng: random.Random) -> set[str]:
+    keywords = set(WORDS[: min(count, len(WORDS))])
+    while len(keywords) < count:
+        keywords.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))))
+    return keywords
+
+
+def make_texts(count: int, rng: random.Random) -> List[str]:
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(WORDS) for _ in range(4)]
+        parts.append("".join(rng.choice(SYLLABLES + " ") for _ in range(rng.randint(80, 260))))
+        texts.append(" ".join(parts))
+    return texts
+
+
+def bench(fn, texts: List[str]) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=2000, help="매칭할 텍스트 수")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = make_texts(args.texts, rng)
+    print(f"{'keywords':>9} {'naive(ms/text)':>15} {'automaton(ms/text)':>19} {'build(ms)':>10} {'speedup':>8}")
+    for count in KEYWORD_COUNTS:
+        keywords = make_keywords(count, rng)
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build = time.perf_counter() - start
+
+        # 두 구현의 결과가 같은지 먼저 확인
+        for text in texts[:200]:
+            assert matcher.search(text) == naive_matched_keywords(keywords, text)
+
+        naive = bench(lambda text: naive_matched_keywords(keywords, text), texts)
+        automaton = bench(matcher.search, texts)
+        print(
+            f"{count:>9} {naive / len(texts) * 1000:>15.4f} {automaton / len(texts) * 1000:>19.4f} "
+            f"{build * 1000:>10.1f} {naive / automaton:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""HTML 파서 백엔드별 처리량 벤치마크 (html.parser 기준 vs lxml 등).
+
+백엔드마다 문서 파싱만(soup 생성), parse_posts, parse_deal_fields를 1x/10x 크기로 재고
+초당 문서 수와 MB/s를 JSON으로 출력한다. 각 백엔드의 추출 결과가 기준 구현과 같은지도 확인한다.
+설치되어 있지 않은 백엔드는 건너뛴다.
+
+사용법: python benchmarks/bench_parser_backends.py [--repeat 20] [--output result.json]
+"""
+
+import argparse
+import json
+import sys
+from typing import List
+
+from bench_parsers import (
+    BASE_HOST,
+    BASE_URL,
+    DETAIL_FIXTURES,
+    SCALES,
+    load_fixture,
+    measure,
+    scale_detail,
+    scale_listing,
+)
+from bs4.builder import builder_registry
+
+from hotdeal_telegram_bot import HTML_PARSER_BACKENDS, AlgumonAdapter
+
+
+def make_adapter(backend: str) -> AlgumonAdapter:
+    # 백엔드 비교이므로 상세 필드도 soup 경로로 뽑는다 (단일 순회 추출기는 백엔드를 쓰지 않는다)
+    adapter = AlgumonAdapter()
+    adapter.parser_backend = backend
+    adapter.detail_extractor = "soup"
+    return adapter
+
+
+def extract_all(adapter: AlgumonAdapter) -> dict:
+    results = {"parse_posts": adapter.parse_posts(load_fixture("algumon_listing.html"), BASE_URL)}
+    for name, page_url in DETAIL_FIXTURES.items():
+        results[name] = adapter.parse_deal_fields(load_fixture(name), page_url, BASE_HOST)
+    return results
+
+
+def run(repeat: int) -> dict:
+    backends = [name for name in HTML_PARSER_BACKENDS if builder_registry.lookup(name) is not None]
+    reference = extract_all(make_adapter(HTML_PARSER_BACKENDS[0]))
+    detail_url = DETAIL_FIXTURES["algumon_detail.html"]
+    results: List[dict] = []
+    identical = {}
+    for backend in backends:
+        adapter = make_adapter(backend)
+        identical[backend] = extract_all(adapter) == reference
+        for scale in SCALES:
+            listing = scale_listing(load_fixture("algumon_listing.html"), scale)
+            detail = scale_detail(load_fixture("algumon_detail.html"), scale)
+            cases = [
+                ("soup:listing", listing, lambda: adapter.make_soup(listing)),
+                ("soup:detail", detail, lambda: adapter.make_soup(detail)),
+                ("parse_posts", listing, lambda: adapter.parse_posts(listing, BASE_URL)),
+                ("parse_deal_fields", detail, lambda: adapter.parse_deal_fields(detail, detail_url, BASE_HOST)),
+            ]
+            for name, html, fn in cases:
+                entry = {"backend": backend, "name": name, "scale": f"{scale}x", "bytes": len(html.encode("utf-8"))}
+                entry.update(measure(fn, repeat))
+                seconds = entry["median_ms"] / 1000
+                entry["docs_per_sec"] = round(1 / seconds, 2) if seconds else None
+                entry["mb_per_sec"] = round(entry["bytes"] / seconds / 1_000_000, 3) if seconds else None
+                results.append(entry)
+                print(
+                    f"{backend:<12} {name:<18} {scale:>3}x {entry['median_ms']:>9.3f} ms "
+                    f"{entry['docs_per_sec']:>9} docs/s {entry['mb_per_sec']:>7} MB/s",
+                    file=sys.stderr,
+                )
+    return {"backends": backends, "identical_to_reference": identical, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="항목별 반복 횟수")
+    parser.add_argument("--output", help="JSON 결과 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    text = json.dumps(run(args.repeat), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
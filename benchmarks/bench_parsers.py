@@ -0,0 +1,306 @@
+"""파서/매처/DB 마이크로 벤치마크 (오프라인, 기록된 알구몬 HTML 픽스처 사용).
+
+각 항목을 실제 크기(1x)와 10배 크기(10x)로 측정해서 JSON으로 출력한다.
+픽스처 파싱 결과가 fixtures/expected.json과 다르면 종료 코드 1로 끝난다.
+
+사용법:
+    python benchmarks/bench_parsers.py [--repeat 20] [--output result.json]
+    python benchmarks/bench_parsers.py --compare before.json      # 이전 결과와 비교
+    python benchmarks/bench_parsers.py --update-expected          # 파서 동작을 의도적으로 바꾼 경우
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bs4  # noqa: E402
+
+from hotdeal_telegram_bot import (  # noqa: E402
+    AlgumonAdapter,
+    CompiledRule,
+    HotdealBot,
+    KeywordManager,
+    RuleEngine,
+    SeenPostRepository,
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+EXPECTED_PATH = os.path.join(FIXTURE_DIR, "expected.json")
+BASE_URL = "https://www.algumon.com/"
+BASE_HOST = "algumon.com"
+DETAIL_FIXTURES = {
+    "algumon_detail.html": "https://www.algumon.com/deal/938900",
+    "algumon_detail_plain.html": "https://www.algumon.com/deal/938701",
+}
+# 실제 운영 규모: 키워드 30개, seen_posts 1만 행, 목록 한 페이지 50건
+KEYWORD_COUNT = 30
+RULE_COUNT = 200
+SEEN_ROWS = 10_000
+BATCH_SIZE = 50
+SCALES = (1, 10)
+SYLLABLES = "가나다라마바사아자차카타파하특가대란오류배송무료쿠팡"
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def scale_listing(html: str, factor: int) -> str:
+    # .post-list 항목을 factor배로 늘린다. 복사본마다 글 번호를 바꿔서 중복 제거에 걸리지 않게 한다
+    start = html.index('<ul class="post-list">') + len('<ul class="post-list">')
+    end = html.index("</ul>", html.index("</li>", start) + 1)
+    end = html.rindex("</li>", start, end) + len("</li>")
+    items = html[start:end]
+    copies = [re.sub(r"\b9\d{5}\b", lambda m, k=k: str(int(m.group(0)) - k * 10_000), items) for k in range(factor)]
+    return html[:start] + "".join(copies) + html[end:]
+
+
+def scale_detail(html: str, factor: int) -> str:
+    # 본문 뒤에 댓글/본문 블록을 덧붙여 문서 크기만 키운다 (필드 추출 결과는 같아야 한다)
+    start = html.index("<main")
+    end = html.index("</main>")
+    body = html[html.index(">", start) + 1 : end]
+    return html[:end] + body * (factor - 1) + html[end:]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    fn()  # 워밍업
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0] * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+    }
+
+
+def make_keywords(count: int, rng: random.Random) -> List[str]:
+    keywords = ["4070", "특가", "오류", "대란", "모니터", "SSD", "에어팟", "치킨", "무료배송", "쿠팡"]
+    while len(keywords) < count:
+        keywords.append("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return keywords[:count]
+
+
+def make_rules(count: int, rng: random.Random) -> List[CompiledRule]:
+    # 단어+가격 조건, 제외어, 판매처 한정, 앵커 없는 숫자 조건을 섞는다
+    keywords = make_keywords(count, rng)
+    templates = ["{kw} price<{n}만", "{kw} -중고 -리퍼", "seller:쿠팡 {kw} OR {kw2}", "price<={n}천 shipping=0"]
+    return [
+        CompiledRule(
+            f"r{i}",
+            templates[i % len(templates)].format(kw=keywords[i], kw2=rng.choice(keywords), n=rng.randint(1, 50)),
+        )
+        for i in range(count)
+    ]
+
+
+def soup_adapter() -> AlgumonAdapter:
+    adapter = AlgumonAdapter()
+    adapter.detail_extractor = "soup"
+    return adapter
+
+
+def parse_results() -> dict:
+    adapter = AlgumonAdapter()
+    results = {"parse_posts": HotdealBot.parse_posts(load_fixture("algumon_listing.html"), BASE_URL)}
+    for name, page_url in DETAIL_FIXTURES.items():
+        html = load_fixture(name)
+        results[f"parse_deal_fields:{name}"] = adapter.parse_deal_fields(html, page_url, BASE_HOST)
+        results[f"parse_origin_link:{name}"] = adapter.parse_origin_link(html, page_url, BASE_HOST)
+    return results
+
+
+def check_expected(update: bool) -> dict:
+    actual = parse_results()
+    if update or not os.path.exists(EXPECTED_PATH):
+        with open(EXPECTED_PATH, "w", encoding="utf-8") as f:
+            json.dump(actual, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    with open(EXPECTED_PATH, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    checks = {name: actual.get(name) == value for name, value in expected.items()}
+    # 단일 순회 추출기와 soup 기준 구현은 항상 같은 결과를 내야 한다
+    soup = soup_adapter()
+    for name, page_url in DETAIL_FIXTURES.items():
+        html = load_fixture(name)
+        checks[f"single_pass==soup:{name}"] = actual[f"parse_deal_fields:{name}"] == soup.parse_deal_fields(
+            html, page_url, BASE_HOST
+        )
+    # 판매처 조건은 목록 단계에서 알 수 없으므로 상세 조회 대상이어야 하고, 상세 정보로 판정되어야 한다
+    seller_rule = RuleEngine([CompiledRule("seller", "seller:쿠팡 price<20000")])
+    checks["rules.evaluate_batch:seller_unknown"] = seller_rule.evaluate_batch(
+        [("무선 마우스", None), ("무선 마우스", {"seller": "쿠팡", "price": "9,900원"}), ("무선 마우스", {"seller": "11번가"})]
+    ) == [["seller"], ["seller"], []]
+    return checks
+
+
+def run_benchmarks(repeat: int, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    adapter = AlgumonAdapter()
+    soup = soup_adapter()
+    listing = load_fixture("algumon_listing.html")
+    detail = load_fixture("algumon_detail.html")
+    detail_url = DETAIL_FIXTURES["algumon_detail.html"]
+    results = []
+
+    def add(name: str, scale: int, size: int, unit: str, fn: Callable[[], object]) -> None:
+        entry = {"name": name, "scale": f"{scale}x", "size": size, "unit": unit}
+        entry.update(measure(fn, repeat))
+        results.append(entry)
+        print(f"{name:<28} {scale:>3}x {entry['median_ms']:>10.3f} ms ({size} {unit})", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in SCALES:
+            listing_html = scale_listing(listing, scale)
+            posts = HotdealBot.parse_posts(listing_html, BASE_URL)
+            add("parse_posts", scale, len(posts), "posts", lambda: HotdealBot.parse_posts(listing_html, BASE_URL))
+
+            detail_html = scale_detail(detail, scale)
+            add(
+                "parse_deal_fields",
+                scale,
+                len(detail_html),
+                "chars",
+                lambda: adapter.parse_deal_fields(detail_html, detail_url, BASE_HOST),
+            )
+            add(
+                "parse_deal_fields[soup]",
+                scale,
+                len(detail_html),
+                "chars",
+                lambda: soup.parse_deal_fields(detail_html, detail_url, BASE_HOST),
+            )
+            add(
+                "parse_origin_link",
+                scale,
+                len(detail_html),
+                "chars",
+                lambda: adapter.parse_origin_link(detail_html, detail_url, BASE_HOST),
+            )
+
+            links = [post["link"] for post in posts]
+            add(
+                "_extract_post_id_from_link",
+                scale,
+                len(links),
+                "links",
+                lambda: [HotdealBot._extract_post_id_from_link(link) for link in links],
+            )
+
+            manager = KeywordManager(os.path.join(tmp, f"keywords-{scale}.json"))
+            for keyword in make_keywords(KEYWORD_COUNT * scale, rng):
+                manager.add(keyword)
+            deal = adapter.parse_deal_fields(detail, detail_url, BASE_HOST)
+            haystacks = [HotdealBot.build_keyword_haystack(post["title"], deal) for post in posts[:BATCH_SIZE]]
+            add(
+                "matched_keywords",
+                scale,
+                len(manager.list_keywords()),
+                "keywords",
+                lambda: [manager.matched_keywords(text) for text in haystacks],
+            )
+
+            engine = RuleEngine(make_rules(RULE_COUNT * scale, rng))
+            batch_items = [(post["title"], deal) for post in posts[:BATCH_SIZE]]
+            add("rules.evaluate_batch", scale, len(engine), "rules", lambda: engine.evaluate_batch(batch_items))
+
+            # 캐시를 끄고 SQLite 경로만 측정
+            repo = SeenPostRepository(os.path.join(tmp, f"seen-{scale}.db"), cache_size=0, bloom_capacity=0)
+            rows = SEEN_ROWS * scale
+            repo.add_many((str(i), f"딜 {i}", f"{BASE_URL}deal/{i}") for i in range(rows))
+            batch = BATCH_SIZE * scale
+            lookup = [str(rng.randrange(rows * 2)) for _ in range(batch)]
+            add("repo.has_many", scale, batch, "ids", lambda: repo.has_many(lookup))
+            counter = iter(range(rows * 2, rows * 2 + 10_000_000, batch))
+
+            def add_batch() -> None:
+                first = next(counter)
+                repo.add_many((str(i), f"딜 {i}", f"{BASE_URL}deal/{i}") for i in range(first, first + batch))
+
+            add("repo.add_many", scale, batch, "rows", add_batch)
+            add("repo.get_state", scale, 1, "keys", lambda: repo.get_state("listing:algumon"))
+            repo.close()
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path: str, results: List[dict]) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+    print(f"{'benchmark':<28} {'scale':>5} {'before':>10} {'after':>10} {'ratio':>7}", file=sys.stderr)
+    for result in results:
+        before = baseline.get((result["name"], result["scale"]))
+        if before is None:
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        print(
+            f"{result['name']:<28} {result['scale']:>5} {before['median_ms']:>10.3f} "
+            f"{result['median_ms']:>10.3f} {ratio:>6.2f}x",
+            file=sys.stderr,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="항목별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 결과 파일 (기본: 표준 출력)")
+    parser.add_argument("--compare", help="비교할 이전 JSON 결과 파일")
+    parser.add_argument("--update-expected", action="store_true", help="fixtures/expected.json을 현재 결과로 갱신")
+    args = parser.parse_args()
+
+    checks = check_expected(args.update_expected)
+    results = run_benchmarks(args.repeat, args.seed)
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "bs4": bs4.__version__,
+        "checks": checks,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        compare(args.compare, results)
+
+    failed = [name for name, ok in checks.items() if not ok]
+    if failed:
+        print(f"파싱 결과가 expected.json과 다릅니다: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
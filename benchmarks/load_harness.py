@@ -0,0 +1,285 @@
+"""종단 간 부하 테스트: 가짜 딜 사이트 + 가짜 텔레그램 API로 실제 HotdealBot.run 루프를 돌린다.
+
+- 딜 사이트: 설정한 도착률(건/초)로 새 글이 올라오는 알구몬 형식 목록과,
+  일부는 느리거나 실패(HTTP 500)하는 상세 페이지를 제공한다.
+- 텔레그램 API: sendMessage를 기록하고, 일정 비율로 429(retry_after)를 돌려준다.
+
+글이 목록에 올라온 시각부터 알림이 텔레그램 API에 도착한 시각까지를 지연 시간으로 재서
+백분위수와 처리량을 JSON으로 출력한다.
+
+사용법:
+    python benchmarks/load_harness.py --rate 2 --duration 60 [--interval 5] [--rate-limit-ratio 0.05]
+
+그 밖의 BotConfig 값은 평소처럼 환경 변수로 조정한다 (예: TELEGRAM_CHAT_RATE=30 DETAIL_CONCURRENCY=4).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotdeal_telegram_bot import BotConfig, HotdealBot  # noqa: E402
+
+LISTING_SIZE = 50
+FIRST_POST_ID = 1_000_000
+TOKEN = "123456:LOADTEST"
+CHAT_ID = "1000"
+ITEMS = ["모니터", "SSD 1TB", "에어팟", "노트북", "치킨 쿠폰", "라면 40봉", "생수 24병", "키보드", "무선청소기", "RTX 4070"]
+DEAL_LINK_RE = re.compile(r"/deal/(\d+)")
+
+
+class StandInDealSite:
+    """알구몬 형식의 목록/상세 페이지를 제공하는 로컬 사이트."""
+
+    def __init__(self, rate: float, detail_delay: float, slow_ratio: float, slow_delay: float, fail_ratio: float, seed: int):
+        self.rate = rate
+        self.detail_delay = detail_delay
+        self.slow_ratio = slow_ratio
+        self.slow_delay = slow_delay
+        self.fail_ratio = fail_ratio
+        self.rng = random.Random(seed)
+        self.posts: Deque[tuple[int, str]] = deque(maxlen=LISTING_SIZE)
+        self.created_at: dict[int, float] = {}
+        self.next_id = FIRST_POST_ID
+        self.listing_requests = 0
+        self.detail_requests = 0
+        self.detail_failures = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self.handle_listing)
+        app.router.add_get("/deal/{post_id}", self.handle_detail)
+        return app
+
+    def publish(self) -> None:
+        post_id = self.next_id
+        self.next_id += 1
+        price = self.rng.randint(10, 2000) * 100
+        self.posts.appendleft((post_id, f"[쿠팡] {self.rng.choice(ITEMS)} ({price:,}원/무료)"))
+        self.created_at[post_id] = time.time()
+
+    async def produce(self, stop: asyncio.Event) -> None:
+        # 포아송 도착 과정
+        while not stop.is_set():
+            await asyncio.sleep(self.rng.expovariate(self.rate))
+            self.publish()
+
+    async def handle_listing(self, _: web.Request) -> web.Response:
+        self.listing_requests += 1
+        items = "".join(
+            f'<li><div class="product-body"><a href="/deal/{post_id}"><span class="item-name">{title}</span></a></div></li>'
+            for post_id, title in self.posts
+        )
+        html = f"<html><body><ul class='post-list'>{items}</ul></body></html>"
+        return web.Response(text=html, content_type="text/html")
+
+    async def handle_detail(self, request: web.Request) -> web.Response:
+        self.detail_requests += 1
+        post_id = int(request.match_info["post_id"])
+        slow = self.rng.random() < self.slow_ratio
+        await asyncio.sleep(self.slow_delay if slow else self.detail_delay)
+        if self.rng.random() < self.fail_ratio:
+            self.detail_failures += 1
+            return web.Response(status=500, text="error")
+        html = f"""<html><body>
+<a class="product-link" href="https://shop.example.com/p/{post_id}?utm_source=algumon">구매</a>
+<table><tr><th>가격</th><td>{post_id % 1000 * 100:,}원</td></tr><tr><th>배송</th><td>무료배송</td></tr>
+<tr><th>판매처</th><td>쿠팡</td></tr></table>
+<div class="xe_content">부하 테스트 상품 {post_id} 설명입니다.</div></body></html>"""
+        return web.Response(text=html, content_type="text/html")
+
+
+class FakeTelegramApi:
+    """sendMessage 호출을 기록하는 가짜 Bot API. rate_limit_ratio 비율로 429를 돌려준다."""
+
+    def __init__(self, rate_limit_ratio: float, retry_after: int, seed: int):
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.messages: List[tuple[float, str, str]] = []
+        self.rate_limited = 0
+        self._message_id = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if method == "getMe":
+            return web.json_response(
+                {"ok": True, "result": {"id": 123456, "is_bot": True, "first_name": "loadtest", "username": "loadtest_bot"}}
+            )
+        if method != "sendMessage":
+            return web.json_response({"ok": True, "result": True})
+
+        if self.rng.random() < self.rate_limit_ratio:
+            self.rate_limited += 1
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                },
+                status=429,
+            )
+        data = await request.post() if request.content_type != "application/json" else await request.json()
+        chat_id = str(data.get("chat_id"))
+        text = str(data.get("text"))
+        self.messages.append((time.time(), chat_id, text))
+        self._message_id += 1
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": self._message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "text": text,
+                },
+            }
+        )
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return round(ordered[index], 3)
+
+
+async def start_site(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def run(args: argparse.Namespace) -> dict:
+    site = StandInDealSite(args.rate, args.detail_delay, args.slow_ratio, args.slow_delay, args.fail_ratio, args.seed)
+    telegram_api = FakeTelegramApi(args.rate_limit_ratio, args.retry_after, args.seed)
+    site_runner = await start_site(site.app(), args.site_port)
+    api_runner = await start_site(telegram_api.app(), args.api_port)
+    # 시작 시점에 이미 올라와 있는 글 (첫 주기에 모두 새 글로 처리된다)
+    for _ in range(args.initial_posts):
+        site.publish()
+    warmup_ids = set(site.created_at)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(
+            TELEGRAM_TOKEN=TOKEN,
+            CHAT_ID=CHAT_ID,
+            HOTDEAL_URL=f"http://127.0.0.1:{args.site_port}/",
+            TELEGRAM_API_BASE_URL=f"http://127.0.0.1:{args.api_port}/bot",
+            SEEN_DB_PATH=os.path.join(tmp, "seen.db"),
+            KEYWORD_FILE=os.path.join(tmp, "keywords.json"),
+            SOURCES_FILE=os.path.join(tmp, "sources.json"),
+            STARTUP_TEST_MESSAGE="false",
+            DRY_RUN="false",
+            CHECK_INTERVAL_SEC=str(max(5, int(args.interval))),
+        )
+        config = BotConfig()
+        config.validate()
+        # 부하 테스트에서는 운영 하한(5초)보다 짧은 주기도 허용한다
+        config.check_interval_sec = args.interval
+        bot = HotdealBot(config)
+        bot.default_source.interval_sec = args.interval
+        bot.run_console = lambda: None  # 대화형 콘솔 없이 실행
+
+        stop = asyncio.Event()
+        producer = asyncio.create_task(site.produce(stop))
+        bot_task = asyncio.create_task(bot.run())
+        started = time.time()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        producer.cancel()
+        # 생산을 멈춘 뒤 남은 알림이 빠질 때까지 기다린다
+        await asyncio.sleep(args.drain)
+        bot.stop_event.set()
+        bot_task.cancel()
+        await asyncio.gather(producer, bot_task, return_exceptions=True)
+        elapsed = time.time() - started
+
+    await site_runner.cleanup()
+    await api_runner.cleanup()
+
+    latencies = []
+    delivered: set[int] = set()
+    for received_at, chat_id, text in telegram_api.messages:
+        match = DEAL_LINK_RE.search(text)
+        if chat_id != CHAT_ID or not text.startswith("🚨") or not match:
+            continue
+        post_id = int(match.group(1))
+        if post_id in delivered or post_id in warmup_ids:
+            continue
+        delivered.add(post_id)
+        latencies.append(received_at - site.created_at[post_id])
+
+    published = len(site.created_at) - len(warmup_ids)
+    return {
+        "config": vars(args),
+        "elapsed_sec": round(elapsed, 2),
+        "published": published,
+        "alerts_delivered": len(delivered),
+        "alerts_missing": published - len(delivered),
+        "messages_total": len(telegram_api.messages),
+        "throughput_msgs_per_sec": round(len(telegram_api.messages) / elapsed, 3),
+        "telegram_429": telegram_api.rate_limited,
+        "listing_requests": site.listing_requests,
+        "detail_requests": site.detail_requests,
+        "detail_failures": site.detail_failures,
+        "latency_sec": {
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+            "max": round(max(latencies), 3) if latencies else None,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=1.0, help="새 글 도착률 (건/초)")
+    parser.add_argument("--duration", type=float, default=60.0, help="글 생산 시간 (초)")
+    parser.add_argument("--drain", type=float, default=15.0, help="생산 종료 후 알림 대기 시간 (초)")
+    parser.add_argument("--interval", type=float, default=5.0, help="목록 폴링 주기 (초)")
+    parser.add_argument("--initial-posts", type=int, default=20, help="시작 시점에 목록에 있는 글 수")
+    parser.add_argument("--detail-delay", type=float, default=0.05, help="상세 페이지 기본 응답 지연 (초)")
+    parser.add_argument("--slow-ratio", type=float, default=0.05, help="느린 상세 페이지 비율")
+    parser.add_argument("--slow-delay", type=float, default=3.0, help="느린 상세 페이지 지연 (초)")
+    parser.add_argument("--fail-ratio", type=float, default=0.02, help="HTTP 500을 돌려주는 상세 페이지 비율")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.02, help="sendMessage에 429를 돌려주는 비율")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 retry_after (초)")
+    parser.add_argument("--site-port", type=int, default=18181)
+    parser.add_argument("--api-port", type=int, default=18182)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 결과 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
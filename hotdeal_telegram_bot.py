@@ -1,21 +1,109 @@
 import asyncio
+import codecs
+import contextvars
+import cProfile
+import hashlib
 import json
 import logging
+import math
+import multiprocessing
 import os
+import random
 import re
 import signal
 import sqlite3
 import sys
 import threading
 import time
+import tracemalloc
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional
-from urllib.parse import parse_qs, urljoin, urlparse
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from html import unescape as html_unescape
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, TypeVar
+from urllib.parse import parse_qs, parse_qsl, urlencode, urljoin, urlparse, urlunparse
 
 import aiohttp
+from aiohttp import web
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 import telegram
 
+CONNECTOR_LIMIT = 20
+
+T = TypeVar("T")
+
+REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+    )
+}
+
+POST_LIST_START_RE = re.compile(
+    r"<([a-zA-Z][\w-]*)[^>]*\bclass\s*=\s*[\"'][^\"']*(?<![\w-])post-list(?![\w-])", re.IGNORECASE
+)
+
+# 상품 URL 정규화 시 제거할 추적 파라미터 (utm_* 는 접두사로 따로 처리)
+TRACKING_QUERY_PARAMS = frozenset(
+    {
+        "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid", "mc_cid", "mc_eid",
+        "ref", "ref_", "referrer", "src", "source", "sourcetype", "spm", "scm", "trackingid",
+        "affiliate", "affiliateid", "subid", "sub_id", "lptag", "clickid", "click_id", "traceid",
+        "nclick", "napm", "n_media", "n_query", "n_rank", "n_ad_group", "n_ad", "n_keyword",
+        "n_keyword_id", "n_campaign_type", "n_contract", "n_ad_group_type",
+    }
+)
+# 절대 URL을 파라미터로 넘기는 리다이렉터의 파라미터 이름
+REDIRECT_QUERY_KEYS = frozenset({"url", "u", "target", "redirect", "redirect_url", "returnurl", "dest"})
+# 따라가서 최종 주소를 확인해야 하는 단축/제휴 링크 도메인
+SHORT_LINK_HOSTS = frozenset(
+    {
+        "bit.ly", "t.co", "goo.gl", "tinyurl.com", "han.gl", "vo.la", "me2.do", "naver.me",
+        "coupa.ng", "link.coupang.com", "s.click.aliexpress.com", "a.aliexpress.com",
+        "click.linksynergy.com", "app.ac", "url.kr", "zrr.kr",
+    }
+)
+DUPLICATE_ACTIONS = ("off", "suppress", "merge")
+# 같은 선택자 API(select/select_one/get_text)를 쓰는 BeautifulSoup 트리 빌더. 첫 번째가 기준 구현
+HTML_PARSER_BACKENDS = ("html.parser", "lxml")
+DETAIL_EXTRACTORS = ("single_pass", "soup")
+# 재등록 제목 정규화: [태그]/(태그)/【태그】 와 가격 표기 제거
+NEAR_DUP_BRACKET_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)|【[^】]*】|\{[^}]*\}")
+NEAR_DUP_PRICE_RE = re.compile(r"[₩$]\s*[\d,.]+|[\d,.]+\s*(?:만\s*원|원|won)")
+
+# 시간대별 도착률(EWMA) 저장 주기
+RATES_SAVE_INTERVAL_SEC = 600
+
+# 키워드 알림은 눈에 띄도록 같은 메시지를 여러 번 보낸다
+KEYWORD_ALERT_REPEAT = 3
+
+# 발송이 끝난 outbox 행 보관 기간
+OUTBOX_KEEP_SEC = 86400
+
+# 가격 이력을 일별로 줄인 구간의 끝 (fetch_state 키)
+PRICE_DOWNSAMPLED_STATE_KEY = "price_history:downsampled_until"
+
+# 상세 페이지 스트리밍: 읽기 단위, 문자셋을 판별할 앞부분 크기 (HTML 표준의 meta 사전 검사 범위)
+DETAIL_STREAM_CHUNK = 16384
+CHARSET_SNIFF_BYTES = 1024
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+
+# 증분 모드에서 HWM 이하 글을 연속으로 이만큼 만나면 목록 순회를 멈춘다 (고정글 등 예외 허용)
+HWM_STOP_STREAK = 3
+
+# 알림 모드: all(새 글마다 알림) / keyword(키워드에 걸린 글만 알림). 기본 채팅방과 구독자가 같이 쓴다
+ALERT_MODES = ("all", "keyword")
+KEYWORD_PREFILTERS = ("title", "off")
+
+# 구버전(hotdeal_bot)의 기본 키워드. keywords.json에 남아 있으면 로드 시 제거한다.
+LEGACY_DEFAULT_KEYWORDS = frozenset({"4070", "특가", "오류", "대란"})
+
 
 @dataclass
 class BotConfig:
@@ -23,16 +111,98 @@ class BotConfig:
     chat_id: str = field(default_factory=lambda: os.getenv("CHAT_ID", "8408697849"))
     base_url: str = field(default_factory=lambda: os.getenv("HOTDEAL_URL", "https://algumon.com/"))
     check_interval_sec: int = field(default_factory=lambda: int(os.getenv("CHECK_INTERVAL_SEC", "60")))
+    mode: str = field(default_factory=lambda: os.getenv("MODE", "all").lower())
+    # keyword 모드 1단계 필터: title이면 제목에 키워드가 걸린 글만 상세 페이지를 조회한다
+    # (all 모드 구독자가 있으면 모든 글을 조회). off면 모든 새 글을 조회해서 본문까지 매칭한다
+    keyword_prefilter: str = field(default_factory=lambda: os.getenv("KEYWORD_PREFILTER", "title").lower())
     request_timeout_sec: int = field(default_factory=lambda: int(os.getenv("REQUEST_TIMEOUT_SEC", "15")))
     db_path: str = field(default_factory=lambda: os.getenv("SEEN_DB_PATH", "seen_posts.db"))
     keyword_file: str = field(default_factory=lambda: os.getenv("KEYWORD_FILE", "keywords.json"))
+    # 가격/배송비 조건, 제외어, 판매처 필터 등을 쓰는 알림 규칙 ("rule add 이름 식"으로 관리)
+    rule_file: str = field(default_factory=lambda: os.getenv("RULE_FILE", "rules.json"))
     startup_test_message: bool = field(
         default_factory=lambda: os.getenv("STARTUP_TEST_MESSAGE", "true").lower() == "true"
     )
     dry_run: bool = field(default_factory=lambda: os.getenv("DRY_RUN", "false").lower() == "true")
+    # 텔레그램 Bot API 주소 (부하 테스트에서 가짜 API 서버를 가리킬 때 변경)
+    telegram_api_base_url: str = field(
+        default_factory=lambda: os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot")
+    )
     include_origin_link: bool = field(
         default_factory=lambda: os.getenv("INCLUDE_ORIGIN_LINK", "true").lower() == "true"
     )
+    # 적응형 폴링: 시간대별 새 글 도착률로 간격 조정 (min~max 범위, ±jitter 비율)
+    adaptive_polling: bool = field(
+        default_factory=lambda: os.getenv("ADAPTIVE_POLLING", "false").lower() == "true"
+    )
+    min_interval_sec: int = field(default_factory=lambda: int(os.getenv("MIN_INTERVAL_SEC", "15")))
+    max_interval_sec: int = field(default_factory=lambda: int(os.getenv("MAX_INTERVAL_SEC", "300")))
+    poll_jitter: float = field(default_factory=lambda: float(os.getenv("POLL_JITTER", "0.1")))
+    # 추가 감시 소스 정의 파일 (없으면 알구몬만 감시)
+    sources_file: str = field(default_factory=lambda: os.getenv("SOURCES_FILE", "sources.json"))
+    # 상세 페이지 동시 조회 수 (TCPConnector limit=20 이내, 호스트당 제한으로도 사용)
+    detail_concurrency: int = field(default_factory=lambda: int(os.getenv("DETAIL_CONCURRENCY", "8")))
+    # HTML 파싱 실행 위치: inline(이벤트 루프) / thread / process, 대기열이 차면 호출 측이 기다린다
+    parse_executor: str = field(default_factory=lambda: os.getenv("PARSE_EXECUTOR", "thread").lower())
+    parse_workers: int = field(default_factory=lambda: int(os.getenv("PARSE_WORKERS", "2")))
+    parse_queue_size: int = field(default_factory=lambda: int(os.getenv("PARSE_QUEUE_SIZE", "32")))
+    # BeautifulSoup 트리 빌더: html.parser(기준 구현) / lxml(C 파서, 설치되어 있지 않으면 html.parser로 대체)
+    html_parser: str = field(default_factory=lambda: os.getenv("HTML_PARSER", "html.parser").lower())
+    # 상세 페이지 필드 추출: single_pass(태그를 한 번 훑으며 모든 필드를 채움) / soup(BeautifulSoup 기준 구현)
+    detail_extractor: str = field(default_factory=lambda: os.getenv("DETAIL_EXTRACTOR", "single_pass").lower())
+    # 상세 페이지를 조각으로 받으며 추출기에 넣고, 필드가 다 모이거나 MAX_BYTES를 넘으면 다운로드를 끊는다 (0=제한 없음)
+    detail_streaming: bool = field(
+        default_factory=lambda: os.getenv("DETAIL_STREAMING", "true").lower() == "true"
+    )
+    detail_max_bytes: int = field(default_factory=lambda: int(os.getenv("DETAIL_MAX_BYTES", "524288")))
+    # 텔레그램 발송 워커 (전역/채팅방별 초당 전송 수 제한)
+    outbox_workers: int = field(default_factory=lambda: int(os.getenv("OUTBOX_WORKERS", "4")))
+    telegram_global_rate: float = field(default_factory=lambda: float(os.getenv("TELEGRAM_GLOBAL_RATE", "30")))
+    telegram_chat_rate: float = field(default_factory=lambda: float(os.getenv("TELEGRAM_CHAT_RATE", "1")))
+    outbox_max_attempts: int = field(default_factory=lambda: int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8")))
+    # 증분 처리: 처리한 최고 딜 ID(HWM) - 안전 구간 이하의 글은 목록에서 더 보지 않는다
+    incremental_mode: bool = field(
+        default_factory=lambda: os.getenv("INCREMENTAL_MODE", "true").lower() == "true"
+    )
+    hwm_safety_window: int = field(default_factory=lambda: int(os.getenv("HWM_SAFETY_WINDOW", "50")))
+    # 본 글 ID 메모리 캐시 (LRU 크기, 전체 이력 Bloom 필터 용량; 0이면 비활성)
+    seen_cache_size: int = field(default_factory=lambda: int(os.getenv("SEEN_CACHE_SIZE", "5000")))
+    seen_bloom_capacity: int = field(default_factory=lambda: int(os.getenv("SEEN_BLOOM_CAPACITY", "1000000")))
+    # 상세 페이지 파싱 결과 캐시 (크기 0이면 비활성, PERSIST면 DB에도 보존)
+    detail_cache_size: int = field(default_factory=lambda: int(os.getenv("DETAIL_CACHE_SIZE", "2000")))
+    detail_cache_ttl_sec: int = field(default_factory=lambda: int(os.getenv("DETAIL_CACHE_TTL_SEC", "86400")))
+    detail_cache_persist: bool = field(
+        default_factory=lambda: os.getenv("DETAIL_CACHE_PERSIST", "true").lower() == "true"
+    )
+    # 같은 상품(정규화 원문 URL)의 최근 알림이 있으면 off/suppress/merge
+    origin_dedup_mode: str = field(default_factory=lambda: os.getenv("ORIGIN_DEDUP_MODE", "off").lower())
+    origin_dedup_window_hours: int = field(default_factory=lambda: int(os.getenv("ORIGIN_DEDUP_WINDOW_HOURS", "24")))
+    resolve_short_links: bool = field(
+        default_factory=lambda: os.getenv("RESOLVE_SHORT_LINKS", "true").lower() == "true"
+    )
+    # 제목(+본문) MinHash 유사도로 재등록 글 감지: off/suppress/merge
+    near_dup_mode: str = field(default_factory=lambda: os.getenv("NEAR_DUP_MODE", "off").lower())
+    near_dup_threshold: float = field(default_factory=lambda: float(os.getenv("NEAR_DUP_THRESHOLD", "0.8")))
+    near_dup_window_hours: int = field(default_factory=lambda: int(os.getenv("NEAR_DUP_WINDOW_HOURS", "24")))
+    # 상품별 가격 이력: 새 딜이 최근 N일 최저가이거나 직전 가격보다 X% 이상 싸면 알림에 표시한다
+    price_history: bool = field(default_factory=lambda: os.getenv("PRICE_HISTORY", "true").lower() == "true")
+    price_lowest_days: int = field(default_factory=lambda: int(os.getenv("PRICE_LOWEST_DAYS", "30")))
+    price_drop_percent: float = field(default_factory=lambda: float(os.getenv("PRICE_DROP_PERCENT", "10")))
+    # RAW_DAYS가 지난 관측은 상품/일별 최저가 한 행으로 줄이고, RETENTION_DAYS가 지나면 지운다 (0이면 영구 보관)
+    price_history_raw_days: int = field(default_factory=lambda: int(os.getenv("PRICE_HISTORY_RAW_DAYS", "7")))
+    price_history_retention_days: int = field(
+        default_factory=lambda: int(os.getenv("PRICE_HISTORY_RETENTION_DAYS", "365"))
+    )
+    # seen_posts 보관 정책 (0이면 해당 조건 비활성)
+    seen_retention_days: int = field(default_factory=lambda: int(os.getenv("SEEN_RETENTION_DAYS", "30")))
+    seen_max_rows: int = field(default_factory=lambda: int(os.getenv("SEEN_MAX_ROWS", "100000")))
+    prune_interval_sec: int = field(default_factory=lambda: int(os.getenv("PRUNE_INTERVAL_SEC", "3600")))
+    prune_batch_size: int = field(default_factory=lambda: int(os.getenv("PRUNE_BATCH_SIZE", "500")))
+    # Prometheus 형식 메트릭 엔드포인트 (/metrics). 0이면 비활성
+    metrics_port: int = field(default_factory=lambda: int(os.getenv("METRICS_PORT", "0")))
+    metrics_host: str = field(default_factory=lambda: os.getenv("METRICS_HOST", "127.0.0.1"))
+    # 한 주기가 이 시간(초)을 넘으면 단계별 소요 시간을 로그로 남김. 0이면 비활성
+    slow_cycle_sec: float = field(default_factory=lambda: float(os.getenv("SLOW_CYCLE_SEC", "0")))
 
     def validate(self) -> None:
         if not self.telegram_token and not self.dry_run:
@@ -41,117 +211,3181 @@ class BotConfig:
             raise ValueError("CHAT_ID가 비어 있습니다.")
         if self.check_interval_sec < 5:
             raise ValueError("CHECK_INTERVAL_SEC는 5초 이상으로 설정하세요.")
+        if self.mode not in ALERT_MODES:
+            raise ValueError(f"MODE는 {', '.join(ALERT_MODES)} 중 하나여야 합니다.")
+        if self.keyword_prefilter not in KEYWORD_PREFILTERS:
+            raise ValueError(f"KEYWORD_PREFILTER는 {', '.join(KEYWORD_PREFILTERS)} 중 하나여야 합니다.")
+        if not 5 <= self.min_interval_sec <= self.max_interval_sec:
+            raise ValueError("MIN_INTERVAL_SEC는 5 이상, MAX_INTERVAL_SEC 이하로 설정하세요.")
+        if not 0 <= self.poll_jitter < 1:
+            raise ValueError("POLL_JITTER는 0 이상 1 미만이어야 합니다.")
+        if not 1 <= self.detail_concurrency <= CONNECTOR_LIMIT:
+            raise ValueError(f"DETAIL_CONCURRENCY는 1~{CONNECTOR_LIMIT} 사이로 설정하세요.")
+        if self.parse_executor not in ParsePool.MODES:
+            raise ValueError(f"PARSE_EXECUTOR는 {', '.join(ParsePool.MODES)} 중 하나여야 합니다.")
+        if self.html_parser not in HTML_PARSER_BACKENDS:
+            raise ValueError(f"HTML_PARSER는 {', '.join(HTML_PARSER_BACKENDS)} 중 하나여야 합니다.")
+        if self.detail_extractor not in DETAIL_EXTRACTORS:
+            raise ValueError(f"DETAIL_EXTRACTOR는 {', '.join(DETAIL_EXTRACTORS)} 중 하나여야 합니다.")
+        if self.detail_max_bytes < 0 or 0 < self.detail_max_bytes < CHARSET_SNIFF_BYTES:
+            raise ValueError(f"DETAIL_MAX_BYTES는 0(제한 없음) 또는 {CHARSET_SNIFF_BYTES} 이상이어야 합니다.")
+        if self.parse_workers < 1 or self.parse_queue_size < 0:
+            raise ValueError("PARSE_WORKERS는 1 이상, PARSE_QUEUE_SIZE는 0 이상이어야 합니다.")
+        if self.outbox_workers < 1 or self.outbox_max_attempts < 1:
+            raise ValueError("OUTBOX_WORKERS / OUTBOX_MAX_ATTEMPTS는 1 이상이어야 합니다.")
+        if self.telegram_global_rate <= 0 or self.telegram_chat_rate <= 0:
+            raise ValueError("TELEGRAM_GLOBAL_RATE / TELEGRAM_CHAT_RATE는 0보다 커야 합니다.")
+        if self.hwm_safety_window < 0:
+            raise ValueError("HWM_SAFETY_WINDOW는 0 이상이어야 합니다.")
+        if self.seen_cache_size < 0 or self.seen_bloom_capacity < 0:
+            raise ValueError("SEEN_CACHE_SIZE / SEEN_BLOOM_CAPACITY는 0 이상이어야 합니다.")
+        if self.detail_cache_size < 0 or self.detail_cache_ttl_sec < 1:
+            raise ValueError("DETAIL_CACHE_SIZE는 0 이상, DETAIL_CACHE_TTL_SEC는 1 이상이어야 합니다.")
+        if self.origin_dedup_mode not in DUPLICATE_ACTIONS:
+            raise ValueError(f"ORIGIN_DEDUP_MODE는 {', '.join(DUPLICATE_ACTIONS)} 중 하나여야 합니다.")
+        if self.origin_dedup_window_hours < 1:
+            raise ValueError("ORIGIN_DEDUP_WINDOW_HOURS는 1 이상이어야 합니다.")
+        if self.near_dup_mode not in DUPLICATE_ACTIONS:
+            raise ValueError(f"NEAR_DUP_MODE는 {', '.join(DUPLICATE_ACTIONS)} 중 하나여야 합니다.")
+        if not 0 < self.near_dup_threshold <= 1 or self.near_dup_window_hours < 1:
+            raise ValueError("NEAR_DUP_THRESHOLD는 0~1, NEAR_DUP_WINDOW_HOURS는 1 이상이어야 합니다.")
+        if self.price_lowest_days < 1 or self.price_history_raw_days < 1:
+            raise ValueError("PRICE_LOWEST_DAYS / PRICE_HISTORY_RAW_DAYS는 1 이상이어야 합니다.")
+        if not 0 <= self.price_drop_percent < 100:
+            raise ValueError("PRICE_DROP_PERCENT는 0(비활성) 이상 100 미만이어야 합니다.")
+        if self.price_history_retention_days < 0 or 0 < self.price_history_retention_days < max(
+            self.price_lowest_days, self.price_history_raw_days
+        ):
+            raise ValueError("PRICE_HISTORY_RETENTION_DAYS는 0(영구) 또는 PRICE_LOWEST_DAYS/RAW_DAYS 이상이어야 합니다.")
+        if self.seen_retention_days < 0 or self.seen_max_rows < 0:
+            raise ValueError("SEEN_RETENTION_DAYS / SEEN_MAX_ROWS는 0 이상이어야 합니다.")
+        if self.prune_interval_sec < 60 or self.prune_batch_size < 1:
+            raise ValueError("PRUNE_INTERVAL_SEC는 60 이상, PRUNE_BATCH_SIZE는 1 이상이어야 합니다.")
+        if not 0 <= self.metrics_port <= 65535:
+            raise ValueError("METRICS_PORT는 0~65535 사이로 설정하세요.")
+        if self.slow_cycle_sec < 0:
+            raise ValueError("SLOW_CYCLE_SEC는 0 이상이어야 합니다.")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    # {:g}는 유효숫자 6자리로 반올림해서 100만을 넘는 누적값이 계단처럼 보인다
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """라벨 조합별 누적 카운터 (Prometheus counter)."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, value: float, *labels: str) -> None:
+        # 다른 객체가 이미 세고 있는 누적값을 수집 시점에 옮겨 담을 때 사용
+        with self._lock:
+            self._values[labels] = float(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """라벨 조합별 지연 시간 히스토그램 (Prometheus histogram, 단위: 초)."""
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # 라벨 -> [버킷별 개수..., 합계, 전체 개수]
+        self._values: dict[tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, state in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    le = _format_labels(self.label_names, labels, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{le} {_format_value(cumulative)}")
+                le = _format_labels(self.label_names, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {_format_value(state[-1])}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {state[-2]:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Histogram:
+        metric = Histogram(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        for callback in self._collectors:
+            callback()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+LISTING_FETCH_SECONDS = METRICS.histogram("hotdeal_listing_fetch_seconds", "목록 페이지 요청 시간", ("source",))
+PARSE_POSTS_SECONDS = METRICS.histogram("hotdeal_parse_posts_seconds", "목록 파싱 시간", ("source",))
+DETAIL_FETCH_SECONDS = METRICS.histogram("hotdeal_detail_fetch_seconds", "상세 페이지 요청 시간", ("source",))
+PARSE_DEAL_FIELDS_SECONDS = METRICS.histogram(
+    "hotdeal_parse_deal_fields_seconds", "상세 페이지 파싱 시간", ("source",)
+)
+KEYWORD_MATCH_SECONDS = METRICS.histogram("hotdeal_keyword_match_seconds", "키워드/구독자 매칭 시간")
+DB_OP_SECONDS = METRICS.histogram("hotdeal_db_op_seconds", "SQLite 작업 시간 (DB 스레드 기준)", ("op",))
+SEND_MESSAGE_SECONDS = METRICS.histogram("hotdeal_send_message_seconds", "텔레그램 전송 시간")
+POSTS_SEEN_TOTAL = METRICS.counter("hotdeal_posts_seen_total", "목록에서 읽은 글 수", ("source",))
+POSTS_NEW_TOTAL = METRICS.counter("hotdeal_posts_new_total", "처음 본 글 수", ("source",))
+POSTS_ALERTED_TOTAL = METRICS.counter("hotdeal_posts_alerted_total", "알림을 적재한 글 수", ("source",))
+HTTP_RESPONSES_TOTAL = METRICS.counter(
+    "hotdeal_http_responses_total", "HTTP 응답 수 (kind=listing/detail, status=코드 또는 timeout)", ("kind", "status")
+)
+CACHE_LOOKUPS_TOTAL = METRICS.counter(
+    "hotdeal_cache_lookups_total", "캐시 조회 결과 수", ("cache", "result")
+)
+DETAIL_STREAM_TOTAL = METRICS.counter(
+    "hotdeal_detail_stream_total", "스트리밍 상세 조회 결과 (complete=끝까지, early=필드 완료, capped=크기 제한)", ("result",)
+)
+DETAIL_BYTES_TOTAL = METRICS.counter("hotdeal_detail_bytes_total", "상세 페이지에서 내려받은 바이트 수", ("source",))
+DETAIL_SKIPPED_TOTAL = METRICS.counter(
+    "hotdeal_detail_skipped_total", "제목 1단계 필터에서 걸러져 상세 조회를 생략한 글 수", ("source",)
+)
+
+
+class CycleTrace:
+    """한 폴링 주기의 단계별 소요 시간. 동시에 실행된 단계(상세 조회 등)는 합계와 횟수로 센다."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: dict[str, List[float]] = {}
+
+    def add(self, stage: str, elapsed: float) -> None:
+        entry = self.stages.setdefault(stage, [0.0, 0])
+        entry[0] += elapsed
+        entry[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        return ", ".join(f"{stage} {total:.3f}s/{count:.0f}회" for stage, (total, count) in self.stages.items())
+
+
+# 주기마다 check_source가 설정한다. 상세 조회 태스크는 생성 시점의 컨텍스트를 물려받는다
+_ACTIVE_TRACE: "contextvars.ContextVar[Optional[CycleTrace]]" = contextvars.ContextVar(
+    "hotdeal_cycle_trace", default=None
+)
+
+
+@contextmanager
+def stage_span(stage: str, histogram: Optional[Histogram] = None, labels: tuple[str, ...] = ()) -> Iterator[None]:
+    # 히스토그램은 항상, 주기 추적은 켜져 있을 때만 기록한다
+    trace = _ACTIVE_TRACE.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if histogram is not None:
+            histogram.observe(elapsed, *labels)
+        if trace is not None:
+            trace.add(stage, elapsed)
+
+
+class CycleProfiler:
+    """콘솔에서 요청한 N개 주기 동안 cProfile 또는 tracemalloc을 켜고 결과를 파일로 남긴다.
+
+    요청/중지는 콘솔 스레드에서, 실제 시작/저장은 이벤트 루프 스레드의 주기 경계에서 일어난다.
+    cProfile은 루프 스레드 전체(다른 소스, 발송 워커 포함)를 측정한다.
+    """
+
+    KINDS = ("cpu", "mem")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Optional[tuple[str, int, str]] = None
+        self._kind: Optional[str] = None
+        self._remaining = 0
+        self._path = ""
+        self._profile: Optional[cProfile.Profile] = None
+
+    def request(self, kind: str, cycles: int, path: Optional[str] = None) -> str:
+        if kind not in self.KINDS or cycles < 1:
+            raise ValueError("profile cpu|mem 주기수 [파일] 형식으로 입력하세요.")
+        suffix = "prof" if kind == "cpu" else "tracemalloc"
+        path = path or f"hotdeal-{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{suffix}"
+        with self._lock:
+            if self._kind is not None or self._pending is not None:
+                raise ValueError("이미 프로파일링 중입니다. profile stop 후 다시 시도하세요.")
+            self._pending = (kind, cycles, path)
+        return path
+
+    def stop(self) -> bool:
+        with self._lock:
+            if self._pending is not None:
+                self._pending = None
+                return True
+            if self._kind is None:
+                return False
+            # 다음 주기가 끝날 때 저장하고 종료
+            self._remaining = 0
+            return True
+
+    def status(self) -> str:
+        with self._lock:
+            if self._pending is not None:
+                return f"대기 중: {self._pending[0]} {self._pending[1]}주기 -> {self._pending[2]}"
+            if self._kind is not None:
+                return f"측정 중: {self._kind} 남은 {self._remaining}주기 -> {self._path}"
+        return "프로파일링 꺼짐"
+
+    def before_cycle(self) -> None:
+        if self._pending is None:
+            return
+        with self._lock:
+            if self._pending is None or self._kind is not None:
+                return
+            self._kind, self._remaining, self._path = self._pending
+            self._pending = None
+        if self._kind == "cpu":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start(10)
+        logging.info("프로파일링 시작: %s %d주기", self._kind, self._remaining)
+
+    def after_cycle(self) -> None:
+        if self._kind is None:
+            return
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining > 0:
+                return
+            kind, path = self._kind, self._path
+            self._kind = None
+        try:
+            if kind == "cpu":
+                assert self._profile is not None
+                self._profile.disable()
+                self._profile.dump_stats(path)
+                self._profile = None
+            else:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                snapshot.dump(path)
+                for stat in snapshot.statistics("lineno")[:5]:
+                    logging.info("메모리 상위: %s", stat)
+            logging.info("프로파일 저장: %s", path)
+        except Exception as exc:
+            logging.exception("프로파일 저장 실패 (%s): %s", path, exc)
+
+
+class HttpStatusError(RuntimeError):
+    def __init__(self, status: int, url: str, retry_after: Optional[float] = None):
+        super().__init__(f"접속 실패: HTTP {status} ({url})")
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After는 초 단위 숫자 또는 HTTP 날짜
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptivePollScheduler:
+    """다음 폴링까지 기다릴 시간을 정한다.
+
+    시간대(0~23시)별 새 글 도착률을 EWMA로 추적해 한 번 폴링할 때 새 글이 약
+    TARGET_POSTS_PER_POLL개 잡히도록 간격을 맞추고, 429/5xx/Retry-After를 받으면
+    간격을 늘렸다가 정상 응답이 이어지면 다시 줄인다. 비활성화 시에는 기본 간격에
+    서버 응답에 따른 백오프만 적용한다.
+    """
+
+    TARGET_POSTS_PER_POLL = 1.0
+    EWMA_ALPHA = 0.2
+    MAX_BACKOFF = 32.0
+
+    def __init__(
+        self, adaptive: bool, min_interval: float, max_interval: float, jitter: float = 0.1
+    ):
+        self.adaptive = adaptive
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.hourly_rates: List[Optional[float]] = [None] * 24  # 초당 새 글 수
+        self.backoff = 1.0
+        self._retry_until = 0.0
+        self._last_poll: Optional[float] = None
+
+    def load(self, raw: Optional[str]) -> None:
+        if not raw:
+            return
+        rates = json.loads(raw)
+        if isinstance(rates, list) and len(rates) == 24:
+            self.hourly_rates = [float(r) if r is not None else None for r in rates]
+
+    def dump(self) -> str:
+        return json.dumps(self.hourly_rates)
+
+    def record_poll(self, new_posts: int, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        if self._last_poll is not None and now > self._last_poll:
+            sample = new_posts / (now - self._last_poll)
+            hour = time.localtime(now).tm_hour
+            previous = self.hourly_rates[hour]
+            self.hourly_rates[hour] = (
+                sample if previous is None else previous + self.EWMA_ALPHA * (sample - previous)
+            )
+        self._last_poll = now
+        self.backoff = max(1.0, self.backoff / 2)
+
+    def record_pushback(self, retry_after: Optional[float] = None, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.backoff = min(self.backoff * 2, self.MAX_BACKOFF)
+        if retry_after:
+            self._retry_until = max(self._retry_until, now + retry_after)
+
+    def next_interval(self, base_interval: float, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        interval = float(base_interval)
+        if self.adaptive:
+            rate = self.hourly_rates[time.localtime(now).tm_hour]
+            if rate is not None:
+                interval = self.TARGET_POSTS_PER_POLL / rate if rate > 0 else self.max_interval
+            interval = min(max(interval, self.min_interval), self.max_interval)
+        interval *= self.backoff
+        if self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        interval = max(interval, self.min_interval if self.adaptive else 1.0)
+        # Retry-After는 최대 간격보다 길어도 지킨다
+        return max(interval, self._retry_until - now)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class SeenIdCache:
+    """최근 post_id LRU + 전체 이력 Bloom 필터. DB 조회가 필요한 ID만 걸러낸다."""
+
+    def __init__(self, max_size: int, bloom_capacity: int = 0):
+        self.max_size = max_size
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._bloom = BloomFilter(bloom_capacity) if bloom_capacity > 0 else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bloom_negatives = 0
+        self.db_lookups = 0
+
+    def _remember(self, post_id: str) -> None:
+        self._recent[post_id] = None
+        self._recent.move_to_end(post_id)
+        if len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+    def add_many(self, post_ids: Iterable[str]) -> None:
+        with self._lock:
+            for post_id in post_ids:
+                if self.max_size > 0:
+                    self._remember(post_id)
+                if self._bloom is not None:
+                    self._bloom.add(post_id)
+
+    def add_history(self, post_ids: Iterable[str]) -> None:
+        # 워밍업 전용: LRU는 건드리지 않고 Bloom 필터만 채운다
+        if self._bloom is None:
+            return
+        with self._lock:
+            for post_id in post_ids:
+                self._bloom.add(post_id)
+
+    def partition(self, post_ids: Iterable[str]) -> tuple[set[str], List[str]]:
+        # (캐시로 확정된 기존 ID, DB 확인이 필요한 ID) 반환. Bloom에 없으면 새 글로 확정
+        known: set[str] = set()
+        unresolved: List[str] = []
+        with self._lock:
+            for post_id in post_ids:
+                if post_id in self._recent:
+                    self._recent.move_to_end(post_id)
+                    self.hits += 1
+                    known.add(post_id)
+                    continue
+                self.misses += 1
+                if self._bloom is not None and post_id not in self._bloom:
+                    self.bloom_negatives += 1
+                    continue
+                self.db_lookups += 1
+                unresolved.append(post_id)
+        return known, unresolved
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._recent),
+                "max_size": self.max_size,
+                "bloom_capacity": self._bloom.capacity if self._bloom is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bloom_negatives": self.bloom_negatives,
+                "db_lookups": self.db_lookups,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SeenPostRepository:
+    # SQLite 바인딩 변수 제한을 넘지 않도록 IN 조회를 나눠서 실행
+    QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, db_path: str, cache_size: int = 5000, bloom_capacity: int = 0):
+        self.db_path = db_path
+        self.cache = SeenIdCache(cache_size, bloom_capacity)
+        # 모든 SQLite 작업은 전용 스레드 하나에서 장기 연결로 실행 (이벤트 루프 블로킹 방지)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="seen-db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._call(self._init_db)
+        self._call(self._warm_cache)
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        return self._executor.submit(self._timed, fn, *args)
+
+    @staticmethod
+    def _timed(fn: Callable[..., T], *args: Any) -> T:
+        with DB_OP_SECONDS.time(fn.__name__.lstrip("_")):
+            return fn(*args)
+
+    def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        return self._submit(fn, *args).result()
+
+    async def _call_async(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # 새 DB는 처음부터 점진적 VACUUM 모드로 만든다 (기존 DB는 _init_db에서 1회 변환)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self) -> None:
+        self._conn = self._connect()
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS seen_posts (
+                    post_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    link TEXT,
+                    seen_at INTEGER
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_posts_seen_at ON seen_posts (seen_at)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dedupe_key TEXT UNIQUE,
+                    chat_id TEXT,
+                    text TEXT,
+                    status TEXT,
+                    attempts INTEGER,
+                    next_attempt_at REAL,
+                    created_at INTEGER,
+                    sent_at INTEGER
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, next_attempt_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_chat ON outbox (status, chat_id, id)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS subscribers (
+                    chat_id TEXT PRIMARY KEY,
+                    mode TEXT,
+                    created_at INTEGER
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS subscriber_keywords (
+                    chat_id TEXT,
+                    keyword TEXT,
+                    PRIMARY KEY (chat_id, keyword)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS deal_details (
+                    link TEXT PRIMARY KEY,
+                    payload TEXT,
+                    cached_at INTEGER
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_deal_details_cached_at ON deal_details (cached_at)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS product_alerts (
+                    canonical_url TEXT PRIMARY KEY,
+                    post_id TEXT,
+                    title TEXT,
+                    alerted_at INTEGER
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_product_alerts_alerted_at ON product_alerts (alerted_at)")
+            # 상품 키 + 시각 순으로 묶어 저장해서 상품별 기간 조회가 인덱스 범위 하나로 끝난다
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS price_history (
+                    product_key TEXT NOT NULL,
+                    observed_at INTEGER NOT NULL,
+                    price INTEGER NOT NULL,
+                    post_id TEXT NOT NULL,
+                    PRIMARY KEY (product_key, observed_at, post_id)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_price_history_observed_at ON price_history (observed_at)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fetch_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    updated_at INTEGER
+                )
+                """
+            )
+        if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logging.info("seen_posts DB를 점진적 VACUUM 모드로 변환합니다 (1회).")
+            self._conn.execute("VACUUM")
+
+    def _warm_cache(self) -> None:
+        assert self._conn is not None
+        if self.cache.max_size > 0:
+            rows = self._conn.execute(
+                "SELECT post_id FROM seen_posts ORDER BY seen_at DESC LIMIT ?", (self.cache.max_size,)
+            ).fetchall()
+            # 오래된 것부터 넣어야 최신 ID가 LRU 뒤쪽에 남는다
+            self.cache.add_many(row[0] for row in reversed(rows))
+        cursor = self._conn.execute("SELECT post_id FROM seen_posts")
+        while True:
+            batch = cursor.fetchmany(10000)
+            if not batch:
+                break
+            self.cache.add_history(row[0] for row in batch)
+
+    def _has_many(self, post_ids: List[str]) -> set[str]:
+        assert self._conn is not None
+        found: set[str] = set()
+        for start in range(0, len(post_ids), self.QUERY_CHUNK_SIZE):
+            chunk = post_ids[start : start + self.QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT post_id FROM seen_posts WHERE post_id IN ({placeholders})", chunk
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def _add_many(self, rows: List[tuple[str, str, str]]) -> None:
+        assert self._conn is not None
+        now = int(time.time())
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_posts (post_id, title, link, seen_at) VALUES (?, ?, ?, ?)",
+                [(post_id, title, link, now) for post_id, title, link in rows],
+            )
+
+    def _record_posts(
+        self,
+        rows: List[tuple[str, str, str]],
+        messages: List[tuple[str, str, str]],
+        products: List[tuple[str, str, str]],
+        prices: List[tuple[str, int, str]],
+    ) -> None:
+        # 본 글 기록과 발송 대기열 적재를 한 트랜잭션으로 묶어 중복/누락 없이 재시작할 수 있게 한다
+        assert self._conn is not None
+        now = int(time.time())
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO price_history (product_key, observed_at, price, post_id) VALUES (?, ?, ?, ?)",
+                [(product_key, now, price, post_id) for product_key, price, post_id in prices],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO product_alerts (canonical_url, post_id, title, alerted_at) VALUES (?, ?, ?, ?)",
+                [(canonical_url, post_id, title, now) for canonical_url, post_id, title in products],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_posts (post_id, title, link, seen_at) VALUES (?, ?, ?, ?)",
+                [(post_id, title, link, now) for post_id, title, link in rows],
+            )
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO outbox (dedupe_key, chat_id, text, status, attempts, next_attempt_at, created_at)
+                VALUES (?, ?, ?, 'pending', 0, ?, ?)
+                """,
+                [(dedupe_key, chat_id, text, now, now) for dedupe_key, chat_id, text in messages],
+            )
+
+    def _find_recent_product(self, canonical_url: str, since: int) -> Optional[tuple[str, str, int]]:
+        assert self._conn is not None
+        return self._conn.execute(
+            "SELECT post_id, title, alerted_at FROM product_alerts WHERE canonical_url = ? AND alerted_at >= ?",
+            (canonical_url, since),
+        ).fetchone()
+
+    def _price_stats(self, product_key: str, since: int) -> tuple[Optional[int], Optional[int]]:
+        # (since 이후 최저가, 가장 최근 가격). 둘 다 기본 키 범위 조회다
+        assert self._conn is not None
+        lowest = self._conn.execute(
+            "SELECT MIN(price) FROM price_history WHERE product_key = ? AND observed_at >= ?", (product_key, since)
+        ).fetchone()[0]
+        last = self._conn.execute(
+            "SELECT price FROM price_history WHERE product_key = ? ORDER BY observed_at DESC LIMIT 1", (product_key,)
+        ).fetchone()
+        return lowest, (last[0] if last else None)
+
+    def _price_history(self, product_key: str, limit: int) -> List[tuple[int, int, str]]:
+        assert self._conn is not None
+        return self._conn.execute(
+            """
+            SELECT observed_at, price, post_id FROM price_history
+            WHERE product_key = ? ORDER BY observed_at DESC LIMIT ?
+            """,
+            (product_key, limit),
+        ).fetchall()
+
+    def _price_key_for_post(self, post_id: str) -> Optional[str]:
+        # 콘솔 조회용 (post_id에는 인덱스가 없어서 테이블을 훑는다)
+        assert self._conn is not None
+        row = self._conn.execute(
+            "SELECT product_key FROM price_history WHERE post_id = ? LIMIT 1", (post_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _downsample_prices(self, start: int, cutoff: int, batch_size: int) -> tuple[int, int]:
+        """[start, cutoff) 구간의 관측을 상품/일(UTC)마다 최저가 한 행으로 줄인다.
+
+        처리한 그룹 수가 batch_size보다 적으면 구간을 다 처리한 것이다. (삭제 행 수, 처리 그룹 수)
+        """
+        assert self._conn is not None
+        deleted = 0
+        with self._conn:
+            groups = self._conn.execute(
+                """
+                SELECT product_key, observed_at - observed_at % 86400 AS day FROM price_history
+                WHERE observed_at >= ? AND observed_at < ?
+                GROUP BY product_key, day HAVING COUNT(*) > 1 LIMIT ?
+                """,
+                (start, cutoff, batch_size),
+            ).fetchall()
+            for product_key, day in groups:
+                price, post_id = self._conn.execute(
+                    """
+                    SELECT price, post_id FROM price_history
+                    WHERE product_key = ? AND observed_at >= ? AND observed_at < ? ORDER BY price LIMIT 1
+                    """,
+                    (product_key, day, day + 86400),
+                ).fetchone()
+                deleted += self._conn.execute(
+                    "DELETE FROM price_history WHERE product_key = ? AND observed_at >= ? AND observed_at < ?",
+                    (product_key, day, day + 86400),
+                ).rowcount
+                self._conn.execute(
+                    "INSERT INTO price_history (product_key, observed_at, price, post_id) VALUES (?, ?, ?, ?)",
+                    (product_key, day, price, post_id),
+                )
+                deleted -= 1
+        return deleted, len(groups)
+
+    def _prune_prices(self, cutoff: int, batch_size: int) -> int:
+        # WITHOUT ROWID 테이블이라 _prune_table 대신 시각 인덱스로 잘라낸다
+        assert self._conn is not None
+        with self._conn:
+            return self._conn.execute(
+                """
+                DELETE FROM price_history WHERE (product_key, observed_at, post_id) IN (
+                    SELECT product_key, observed_at, post_id FROM price_history WHERE observed_at < ? LIMIT ?
+                )
+                """,
+                (cutoff, batch_size),
+            ).rowcount
+
+    def _recent_posts_with_content(self, since: int) -> List[tuple[str, str, int, Optional[str]]]:
+        assert self._conn is not None
+        return self._conn.execute(
+            """
+            SELECT s.post_id, s.title, s.seen_at, d.payload
+            FROM seen_posts s LEFT JOIN deal_details d ON d.link = s.link
+            WHERE s.seen_at >= ? ORDER BY s.seen_at
+            """,
+            (since,),
+        ).fetchall()
+
+    def _claim_outbox(
+        self, limit: int, per_chat: int, exclude_chats: List[str]
+    ) -> List[tuple[int, str, str, int]]:
+        # 방마다 앞에서부터 per_chat개씩만 가져와서 한 방의 밀린 대기열이 다른 방을 막지 않게 한다.
+        # 방의 맨 앞 행이 재시도 대기 중이면 그 방은 통째로 건너뛴다 (뒤 메시지가 먼저 나가지 않도록)
+        assert self._conn is not None
+        return self._conn.execute(
+            """
+            SELECT id, chat_id, text, attempts FROM (
+                SELECT id, chat_id, text, attempts,
+                       ROW_NUMBER() OVER (PARTITION BY chat_id ORDER BY id) AS position,
+                       FIRST_VALUE(next_attempt_at) OVER (PARTITION BY chat_id ORDER BY id) AS head_due_at
+                FROM outbox
+                WHERE status = 'pending' AND chat_id NOT IN (SELECT value FROM json_each(?))
+            )
+            WHERE position <= ? AND head_due_at <= ?
+            ORDER BY id LIMIT ?
+            """,
+            (json.dumps(exclude_chats), per_chat, time.time(), limit),
+        ).fetchall()
+
+    def _finish_outbox(self, outbox_id: int, status: str) -> None:
+        assert self._conn is not None
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, sent_at = ? WHERE id = ?", (status, int(time.time()), outbox_id)
+            )
+
+    def _retry_outbox(self, outbox_id: int, attempts: int, delay_sec: float) -> None:
+        assert self._conn is not None
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                (attempts, time.time() + delay_sec, outbox_id),
+            )
+
+    def _prune_batch(self, cutoff: Optional[int], max_rows: int, batch_size: int) -> int:
+        assert self._conn is not None
+        deleted = 0
+        with self._conn:
+            if cutoff is not None:
+                deleted = self._conn.execute(
+                    """
+                    DELETE FROM seen_posts WHERE rowid IN (
+                        SELECT rowid FROM seen_posts WHERE seen_at < ? ORDER BY seen_at LIMIT ?
+                    )
+                    """,
+                    (cutoff, batch_size),
+                ).rowcount
+            if deleted < batch_size and max_rows > 0:
+                excess = self._conn.execute("SELECT COUNT(*) FROM seen_posts").fetchone()[0] - max_rows
+                if excess > 0:
+                    deleted += self._conn.execute(
+                        """
+                        DELETE FROM seen_posts WHERE rowid IN (
+                            SELECT rowid FROM seen_posts ORDER BY seen_at LIMIT ?
+                        )
+                        """,
+                        (min(excess, batch_size - deleted),),
+                    ).rowcount
+            # 처리가 끝난 발송 기록은 하루만 보관
+            deleted += self._conn.execute(
+                """
+                DELETE FROM outbox WHERE id IN (
+                    SELECT id FROM outbox WHERE status != 'pending' AND created_at < ? LIMIT ?
+                )
+                """,
+                (int(time.time()) - OUTBOX_KEEP_SEC, batch_size),
+            ).rowcount
+        return deleted
+
+    def _prune_table(self, table: str, time_column: str, cutoff: int, batch_size: int) -> int:
+        assert self._conn is not None
+        with self._conn:
+            return self._conn.execute(
+                f"""
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table} WHERE {time_column} < ? LIMIT ?
+                )
+                """,
+                (cutoff, batch_size),
+            ).rowcount
+
+    def _get_detail(self, link: str, min_cached_at: int) -> Optional[tuple[str, int]]:
+        assert self._conn is not None
+        return self._conn.execute(
+            "SELECT payload, cached_at FROM deal_details WHERE link = ? AND cached_at >= ?", (link, min_cached_at)
+        ).fetchone()
+
+    def _put_detail(self, link: str, payload: str) -> None:
+        assert self._conn is not None
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deal_details (link, payload, cached_at) VALUES (?, ?, ?)",
+                (link, payload, int(time.time())),
+            )
+
+    def _incremental_vacuum(self, max_pages: int) -> int:
+        assert self._conn is not None
+        free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages:
+            # execute()로는 한 페이지만 반환되므로 executescript로 끝까지 실행
+            self._conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+        return free_pages
+
+    def _load_subscribers(self) -> tuple[List[tuple[str, str]], List[tuple[str, str]]]:
+        assert self._conn is not None
+        subscribers = self._conn.execute("SELECT chat_id, mode FROM subscribers").fetchall()
+        keywords = self._conn.execute("SELECT chat_id, keyword FROM subscriber_keywords").fetchall()
+        return subscribers, keywords
+
+    def _save_subscriber(self, chat_id: str, mode: Optional[str]) -> None:
+        # mode가 None이면 구독자와 키워드를 모두 삭제
+        assert self._conn is not None
+        with self._conn:
+            if mode is None:
+                self._conn.execute("DELETE FROM subscribers WHERE chat_id = ?", (chat_id,))
+                self._conn.execute("DELETE FROM subscriber_keywords WHERE chat_id = ?", (chat_id,))
+            else:
+                self._conn.execute(
+                    """
+                    INSERT INTO subscribers (chat_id, mode, created_at) VALUES (?, ?, ?)
+                    ON CONFLICT (chat_id) DO UPDATE SET mode = excluded.mode
+                    """,
+                    (chat_id, mode, int(time.time())),
+                )
+
+    def _save_subscriber_keyword(self, chat_id: str, keyword: str, present: bool) -> None:
+        assert self._conn is not None
+        with self._conn:
+            if present:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO subscriber_keywords (chat_id, keyword) VALUES (?, ?)", (chat_id, keyword)
+                )
+            else:
+                self._conn.execute(
+                    "DELETE FROM subscriber_keywords WHERE chat_id = ? AND keyword = ?", (chat_id, keyword)
+                )
+
+    def _get_state(self, key: str) -> Optional[str]:
+        assert self._conn is not None
+        row = self._conn.execute("SELECT value FROM fetch_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _delete_state(self, key: str) -> None:
+        assert self._conn is not None
+        with self._conn:
+            self._conn.execute("DELETE FROM fetch_state WHERE key = ?", (key,))
+
+    def _set_state(self, key: str, value: str) -> None:
+        assert self._conn is not None
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetch_state (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, value, int(time.time())),
+            )
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def has(self, post_id: str) -> bool:
+        return post_id in self.has_many([post_id])
+
+    def add(self, post_id: str, title: str, link: str) -> None:
+        self.add_many([(post_id, title, link)])
+
+    def has_many(self, post_ids: Iterable[str]) -> set[str]:
+        known, unresolved = self.cache.partition(post_ids)
+        if unresolved:
+            found = self._call(self._has_many, unresolved)
+            self.cache.add_many(found)
+            known |= found
+        return known
+
+    def add_many(self, rows: Iterable[tuple[str, str, str]]) -> None:
+        rows = list(rows)
+        self._call(self._add_many, rows)
+        self.cache.add_many(row[0] for row in rows)
+
+    async def has_many_async(self, post_ids: Iterable[str]) -> set[str]:
+        known, unresolved = self.cache.partition(post_ids)
+        if unresolved:
+            found = await self._call_async(self._has_many, unresolved)
+            self.cache.add_many(found)
+            known |= found
+        return known
+
+    async def add_many_async(self, rows: Iterable[tuple[str, str, str]]) -> None:
+        rows = list(rows)
+        await self._call_async(self._add_many, rows)
+        self.cache.add_many(row[0] for row in rows)
+
+    async def record_posts_async(
+        self,
+        rows: Iterable[tuple[str, str, str]],
+        messages: Iterable[tuple[str, str, str]],
+        products: Iterable[tuple[str, str, str]] = (),
+        prices: Iterable[tuple[str, int, str]] = (),
+    ) -> None:
+        # products: 알림을 보낸 (정규화 상품 URL, post_id, 제목), prices: (상품 키, 가격, post_id)
+        rows = list(rows)
+        await self._call_async(self._record_posts, rows, list(messages), list(products), list(prices))
+        self.cache.add_many(row[0] for row in rows)
+
+    def recent_posts_with_content(self, since: int) -> List[tuple[str, str, int, Optional[str]]]:
+        return self._call(self._recent_posts_with_content, since)
+
+    async def find_recent_product_async(self, canonical_url: str, since: int) -> Optional[tuple[str, str, int]]:
+        return await self._call_async(self._find_recent_product, canonical_url, since)
+
+    async def price_stats_async(self, product_key: str, since: int) -> tuple[Optional[int], Optional[int]]:
+        return await self._call_async(self._price_stats, product_key, since)
+
+    def price_history(self, product_key: str, limit: int = 20) -> List[tuple[int, int, str]]:
+        return self._call(self._price_history, product_key, limit)
+
+    def price_key_for_post(self, post_id: str) -> Optional[str]:
+        return self._call(self._price_key_for_post, post_id)
+
+    async def claim_outbox_async(
+        self, limit: int, per_chat: int, exclude_chats: Iterable[str] = ()
+    ) -> List[tuple[int, str, str, int]]:
+        return await self._call_async(self._claim_outbox, limit, per_chat, sorted(exclude_chats))
+
+    async def finish_outbox_async(self, outbox_id: int, status: str) -> None:
+        await self._call_async(self._finish_outbox, outbox_id, status)
+
+    async def retry_outbox_async(self, outbox_id: int, attempts: int, delay_sec: float) -> None:
+        await self._call_async(self._retry_outbox, outbox_id, attempts, delay_sec)
+
+    def load_subscribers(self) -> tuple[List[tuple[str, str]], List[tuple[str, str]]]:
+        return self._call(self._load_subscribers)
+
+    def save_subscriber(self, chat_id: str, mode: Optional[str]) -> None:
+        self._call(self._save_subscriber, chat_id, mode)
+
+    def save_subscriber_keyword(self, chat_id: str, keyword: str, present: bool) -> None:
+        self._call(self._save_subscriber_keyword, chat_id, keyword, present)
+
+    def delete_state(self, key: str) -> None:
+        self._call(self._delete_state, key)
+
+    def get_state(self, key: str) -> Optional[str]:
+        return self._call(self._get_state, key)
+
+    async def get_state_async(self, key: str) -> Optional[str]:
+        return await self._call_async(self._get_state, key)
+
+    async def set_state_async(self, key: str, value: str) -> None:
+        await self._call_async(self._set_state, key, value)
+
+    async def get_detail_async(self, link: str, min_cached_at: int) -> Optional[tuple[str, int]]:
+        return await self._call_async(self._get_detail, link, min_cached_at)
+
+    async def put_detail_async(self, link: str, payload: str) -> None:
+        await self._call_async(self._put_detail, link, payload)
+
+    async def prune(
+        self,
+        retention_sec: int,
+        max_rows: int,
+        batch_size: int = 500,
+        vacuum_pages: int = 1000,
+        detail_ttl_sec: int = 0,
+        product_ttl_sec: int = 0,
+        price_raw_sec: int = 0,
+        price_retention_sec: int = 0,
+    ) -> int:
+        # 작은 배치로 나눠 지워서 그 사이사이 폴링 쪽 DB 작업이 끼어들 수 있게 한다.
+        # 지워진 ID는 캐시에 남겨 둬서 목록에 다시 보여도 재알림하지 않는다.
+        total = 0
+        while True:
+            cutoff = int(time.time()) - retention_sec if retention_sec > 0 else None
+            deleted = await self._call_async(self._prune_batch, cutoff, max_rows, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+            await asyncio.sleep(0)
+        # 시간 기준으로만 만료되는 보조 테이블
+        expiring = [("deal_details", "cached_at", detail_ttl_sec), ("product_alerts", "alerted_at", product_ttl_sec)]
+        for table, time_column, ttl_sec in expiring:
+            while ttl_sec > 0:
+                cutoff = int(time.time()) - ttl_sec
+                deleted = await self._call_async(self._prune_table, table, time_column, cutoff, batch_size)
+                total += deleted
+                if deleted < batch_size:
+                    break
+                await asyncio.sleep(0)
+        while price_retention_sec > 0:
+            deleted = await self._call_async(self._prune_prices, int(time.time()) - price_retention_sec, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+            await asyncio.sleep(0)
+        if price_raw_sec > 0:
+            total += await self._downsample_price_history(price_raw_sec, batch_size)
+        if total:
+            await self._call_async(self._incremental_vacuum, vacuum_pages)
+        return total
+
+    async def _downsample_price_history(self, raw_sec: int, batch_size: int) -> int:
+        # 하루 단위로 끊어야 그룹이 온전하다. 처리한 끝을 저장해 두고 다음엔 그 뒤만 본다
+        cutoff = int(time.time()) - raw_sec
+        cutoff -= cutoff % 86400
+        start = int(await self.get_state_async(PRICE_DOWNSAMPLED_STATE_KEY) or 0)
+        if start >= cutoff:
+            return 0
+        total = 0
+        while True:
+            deleted, groups = await self._call_async(self._downsample_prices, start, cutoff, batch_size)
+            total += deleted
+            if groups < batch_size:
+                break
+            await asyncio.sleep(0)
+        await self.set_state_async(PRICE_DOWNSAMPLED_STATE_KEY, str(cutoff))
+        return total
+
+    def close(self) -> None:
+        self._call(self._close)
+        self._executor.shutdown(wait=True)
+
+
+def canonicalize_url(url: str, _depth: int = 0) -> str:
+    """상품 URL 정규화: 추적 파라미터/프래그먼트 제거, 호스트 소문자화, 쿼리 정렬.
+
+    url=, target= 같은 파라미터에 절대 URL을 싣는 리다이렉터는 네트워크 없이 풀어낸다.
+    """
+    parsed = urlparse(url.strip())
+    query = parse_qsl(parsed.query, keep_blank_values=True)
+    if _depth < 3:
+        for key, value in query:
+            if key.lower() in REDIRECT_QUERY_KEYS and value.startswith(("http://", "https://")):
+                return canonicalize_url(value, _depth + 1)
+
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    scheme = "https" if parsed.scheme.lower() in ("http", "https") else parsed.scheme.lower()
+    kept = sorted(
+        (key, value)
+        for key, value in query
+        if key.lower() not in TRACKING_QUERY_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((scheme, host, path, "", urlencode(kept), ""))
+
+
+class OriginResolver:
+    """원문 링크를 정규화 상품 URL로 바꾼다.
+
+    단축 링크/리다이렉터 도메인은 실제로 따라가서 최종 주소를 얻고, 결과는 도메인별
+    LRU에 보관한다. 해석에 실패하면 원래 링크를 정규화해서 쓴다.
+    """
+
+    PER_DOMAIN_CACHE_SIZE = 500
+
+    def __init__(self, timeout_sec: int, resolve_short_links: bool = True):
+        self.timeout_sec = timeout_sec
+        self.resolve_short_links = resolve_short_links
+        self._cache: dict[str, "OrderedDict[str, str]"] = {}
+        self.cache_hits = 0
+        self.resolved = 0
+        self.failures = 0
+
+    async def canonicalize(self, session: aiohttp.ClientSession, url: Optional[str]) -> Optional[str]:
+        if not url:
+            return None
+        host = urlparse(url).netloc.lower()
+        if self.resolve_short_links and host in SHORT_LINK_HOSTS:
+            url = await self._resolve(session, url, host)
+        return canonicalize_url(url)
+
+    async def _resolve(self, session: aiohttp.ClientSession, url: str, host: str) -> str:
+        cache = self._cache.setdefault(host, OrderedDict())
+        if url in cache:
+            cache.move_to_end(url)
+            self.cache_hits += 1
+            return cache[url]
+        try:
+            async with session.head(
+                url, headers=REQUEST_HEADERS, allow_redirects=True, timeout=self.timeout_sec
+            ) as resp:
+                final_url = str(resp.url)
+                head_rejected = resp.status in (403, 404, 405)
+            if head_rejected:
+                # HEAD를 막는 리다이렉터는 GET으로 따라가되 본문은 읽지 않는다
+                async with session.get(
+                    url, headers=REQUEST_HEADERS, allow_redirects=True, timeout=self.timeout_sec
+                ) as resp:
+                    final_url = str(resp.url)
+        except Exception as exc:
+            logging.debug("단축 링크 해석 실패 (%s): %s", url, exc)
+            self.failures += 1
+            return url
+        self.resolved += 1
+        cache[url] = final_url
+        if len(cache) > self.PER_DOMAIN_CACHE_SIZE:
+            cache.popitem(last=False)
+        return final_url
+
+    def stats(self) -> dict:
+        return {
+            "domains": len(self._cache),
+            "cached": sum(len(cache) for cache in self._cache.values()),
+            "cache_hits": self.cache_hits,
+            "resolved": self.resolved,
+            "failures": self.failures,
+        }
+
+
+class NearDuplicateIndex:
+    """정규화한 제목(+본문 앞부분)의 MinHash 서명을 LSH 버킷에 넣어 재등록 글을 찾는다.
+
+    대괄호 태그, 가격, 이모지처럼 재등록 때 흔히 바뀌는 부분은 정규화에서 지운다.
+    최근 window_sec 안에 추가된 글만 유지하며, 조회는 같은 버킷 후보만 비교한다.
+    """
+
+    NUM_PERM = 64
+    BANDS = 16
+    SHINGLE_SIZE = 3
+    CONTENT_CHARS = 100
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, threshold: float = 0.8, window_sec: int = 86400, seed: int = 1):
+        self.threshold = threshold
+        self.window_sec = window_sec
+        self._rows = self.NUM_PERM // self.BANDS
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME)) for _ in range(self.NUM_PERM)]
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+        self._entries: dict[str, tuple[tuple[int, ...], str]] = {}
+        self._expiry: deque[tuple[float, str]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = NEAR_DUP_BRACKET_RE.sub(" ", text.lower())
+        text = NEAR_DUP_PRICE_RE.sub(" ", text)
+        text = re.sub(r"[^\w\s]|_", " ", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    def _text_for(self, title: str, content: Optional[str]) -> str:
+        normalized = self.normalize(title)
+        if content:
+            normalized += " " + self.normalize(content)[: self.CONTENT_CHARS]
+        return normalized
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        size = self.SHINGLE_SIZE
+        shingles = {zlib.crc32(text[i : i + size].encode("utf-8")) for i in range(max(1, len(text) - size + 1))}
+        prime = self._PRIME
+        return tuple(min((a * h + b) % prime for h in shingles) for a, b in self._perms)
+
+    def _band_keys(self, signature: tuple[int, ...]) -> Iterable[tuple[int, int]]:
+        rows = self._rows
+        for band in range(self.BANDS):
+            yield band, hash(signature[band * rows : (band + 1) * rows])
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_sec
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, post_id = self._expiry.popleft()
+            entry = self._entries.pop(post_id, None)
+            if entry is None:
+                continue
+            for key in self._band_keys(entry[0]):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(post_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def query(
+        self, title: str, content: Optional[str] = None, now: Optional[float] = None
+    ) -> Optional[tuple[str, str, float]]:
+        # 가장 비슷한 최근 글의 (post_id, 제목, 추정 유사도). 임계값 미만이면 None
+        now = time.time() if now is None else now
+        self._expire(now)
+        text = self._text_for(title, content)
+        if not text:
+            return None
+        signature = self.signature(text)
+        candidates: set[str] = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        best: Optional[tuple[str, str, float]] = None
+        for post_id in candidates:
+            other, other_title = self._entries[post_id]
+            similarity = sum(1 for x, y in zip(signature, other) if x == y) / self.NUM_PERM
+            if similarity >= self.threshold and (best is None or similarity > best[2]):
+                best = (post_id, other_title, similarity)
+        return best
+
+    def add(self, post_id: str, title: str, content: Optional[str] = None, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        text = self._text_for(title, content)
+        if not text or post_id in self._entries:
+            return
+        signature = self.signature(text)
+        self._entries[post_id] = (signature, title)
+        self._expiry.append((now, post_id))
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(post_id)
+
+
+class DealDetailCache:
+    """딜 링크 -> 상세 페이지 파싱 결과 캐시 (TTL, 크기 제한 LRU, 선택적 SQLite 보존).
+
+    같은 딜을 다시 만나도 네트워크 요청과 BeautifulSoup 파싱을 건너뛴다.
+    """
+
+    def __init__(self, max_size: int, ttl_sec: int, repo: Optional[SeenPostRepository] = None):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self.repo = repo
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _remember(self, link: str, cached_at: float, deal: dict) -> None:
+        self._entries[link] = (cached_at, deal)
+        self._entries.move_to_end(link)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, link: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        entry = self._entries.get(link)
+        if entry is not None:
+            if now - entry[0] < self.ttl_sec:
+                self._entries.move_to_end(link)
+                self.hits += 1
+                return dict(entry[1])
+            del self._entries[link]
+        if self.repo is not None:
+            row = await self.repo.get_detail_async(link, int(now - self.ttl_sec))
+            if row is not None:
+                deal = json.loads(row[0])
+                self._remember(link, row[1], deal)
+                self.db_hits += 1
+                return dict(deal)
+        self.misses += 1
+        return None
+
+    async def put(self, link: str, deal: dict) -> None:
+        if not self.enabled:
+            return
+        deal = dict(deal)
+        self._remember(link, time.time(), deal)
+        if self.repo is not None:
+            await self.repo.put_detail_async(link, json.dumps(deal, ensure_ascii=False))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ParsePool:
+    """HTML 파싱을 이벤트 루프 밖의 스레드/프로세스 풀에서 실행한다.
+
+    실행 중 + 대기 중인 작업은 workers + queue_size개로 제한하고, 넘치면 호출한 코루틴이 기다린다.
+    process 모드에서는 함수(어댑터 메서드)와 인자, 결과가 모두 pickle 가능해야 하므로
+    파서는 soup 객체가 아닌 dict/list/str만 돌려준다.
+    """
+
+    MODES = ("inline", "thread", "process")
+
+    def __init__(self, mode: str = "thread", workers: int = 2, queue_size: int = 32):
+        self.mode = mode
+        self._executor: Optional[Executor] = None
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-parse")
+        elif mode == "process":
+            # 이미 DB/콘솔 스레드가 떠 있으므로 fork 대신 spawn으로 워커를 만든다
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._slots = asyncio.Semaphore(workers + queue_size)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            return fn(*args)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _retry_after_seconds(exc: "telegram.error.RetryAfter") -> float:
+    value = exc.retry_after
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class OutboxDispatcher:
+    """outbox 테이블의 대기 메시지를 텔레그램 제한에 맞춰 보내는 비동기 워커.
+
+    채팅방별로 한 번에 하나의 태스크만 돌아서 방 안에서는 적재 순서가 유지된다. 재시도 대기 중인
+    메시지가 있으면 그 방의 뒤 메시지도 함께 기다린다 (전송을 포기한 메시지만 건너뛴다).
+    전송 직후 상태를 기록하므로, 그 사이에 죽는 경우에만 한 번 더 보내질 수 있다.
+    """
+
+    CLAIM_BATCH = 200
+    CHAT_CLAIM_BATCH = 20
+    POLL_SEC = 1.0
+
+    def __init__(
+        self,
+        repo: SeenPostRepository,
+        send: Callable[[str, str], Awaitable[None]],
+        workers: int = 4,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        max_attempts: int = 8,
+    ):
+        self.repo = repo
+        self._send = send
+        self._slots = asyncio.Semaphore(workers)
+        self._global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_rate = chat_rate
+        self._chat_buckets: dict[str, TokenBucket] = {}
+        self._active_chats: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self.max_attempts = max_attempts
+        self.sent = 0
+        self.failed = 0
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def run(self, stop_event: threading.Event) -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            while not stop_event.is_set():
+                self._wakeup.clear()
+                try:
+                    rows = await self.repo.claim_outbox_async(
+                        self.CLAIM_BATCH, self.CHAT_CLAIM_BATCH, self._active_chats
+                    )
+                except Exception as exc:
+                    logging.exception("발송 대기열 조회 실패: %s", exc)
+                    rows = []
+                by_chat: dict[str, List[tuple[int, str, str, int]]] = {}
+                for row in rows:
+                    # 조회하는 사이에 시작된 방은 다음 조회에서 다시 가져온다
+                    if row[1] not in self._active_chats:
+                        by_chat.setdefault(row[1], []).append(row)
+                for chat_id, chat_rows in by_chat.items():
+                    self._active_chats.add(chat_id)
+                    task = asyncio.create_task(self._deliver_chat(chat_id, chat_rows))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.POLL_SEC)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _deliver_chat(self, chat_id: str, rows: List[tuple[int, str, str, int]]) -> None:
+        try:
+            async with self._slots:
+                for outbox_id, _, text, attempts in rows:
+                    if not await self._deliver_one(outbox_id, chat_id, text, attempts):
+                        break
+        finally:
+            self._active_chats.discard(chat_id)
+            self.notify()
+
+    async def _deliver_one(self, outbox_id: int, chat_id: str, text: str, attempts: int) -> bool:
+        # 반환값: 같은 방의 다음 메시지를 이어서 보내도 되는지
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self._chat_rate, capacity=1)
+        while True:
+            await bucket.acquire()
+            await self._global_bucket.acquire()
+            try:
+                await self._send(chat_id, text)
+            except telegram.error.RetryAfter as exc:
+                # 텔레그램 flood 제어는 봇 전체에 걸리므로 전역 버킷을 멈추고 같은 메시지를 다시 시도
+                delay = _retry_after_seconds(exc)
+                logging.warning("텔레그램 RetryAfter %.1fs (chat=%s)", delay, chat_id)
+                self._global_bucket.pause(delay)
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    await self.repo.retry_outbox_async(outbox_id, attempts, delay)
+                    return False
+                continue
+            except (telegram.error.BadRequest, telegram.error.Forbidden) as exc:
+                logging.error("메시지 전송 실패, 재시도하지 않음 (chat=%s): %s", chat_id, exc)
+                self.failed += 1
+                await self.repo.finish_outbox_async(outbox_id, "failed")
+                return True
+            except Exception as exc:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    logging.error("메시지 전송 %d회 실패, 포기 (chat=%s): %s", attempts, chat_id, exc)
+                    self.failed += 1
+                    await self.repo.finish_outbox_async(outbox_id, "failed")
+                    return True
+                delay = min(2**attempts, 300)
+                logging.warning("메시지 전송 실패, %ds 후 재시도 (chat=%s): %s", delay, chat_id, exc)
+                await self.repo.retry_outbox_async(outbox_id, attempts, delay)
+                return False
+            self.sent += 1
+            await self.repo.finish_outbox_async(outbox_id, "sent")
+            return True
+
+
+class KeywordMatcher:
+    """키워드 집합을 Aho-Corasick 오토마톤으로 컴파일한 대소문자 무시 다중 패턴 매처.
+
+    매칭 비용은 키워드 개수와 무관하게 텍스트 길이에 비례한다. 키워드가 적을 때는
+    C로 구현된 부분 문자열 검색이 더 빨라서 그대로 쓴다. 생성 후에는 불변이라
+    여러 스레드에서 잠금 없이 공유할 수 있다.
+    """
+
+    SCAN_THRESHOLD = 32
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({k for k in keywords if k})
+        self._lowered = [k.lower() for k in self.keywords]
+        self._goto: List[dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[tuple[int, ...]] = [()]
+
+        if len(self.keywords) <= self.SCAN_THRESHOLD:
+            return
+        for index, keyword in enumerate(self._lowered):
+            node = 0
+            for ch in keyword:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (index,)
+
+        # BFS로 실패 링크를 만들고, 실패 링크 쪽 출력도 미리 합쳐 둔다
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[self._fail[child]]:
+                    self._out[child] += self._out[self._fail[child]]
+
+    def search(self, text: str) -> List[str]:
+        if len(self.keywords) <= self.SCAN_THRESHOLD:
+            text_lower = text.lower()
+            return [k for k, lowered in zip(self.keywords, self._lowered) if lowered in text_lower]
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: set[int] = set()
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits.update(out[node])
+        return [self.keywords[i] for i in sorted(hits)]
+
+
+class KeywordManager:
+    def __init__(self, keyword_file: str, default_keywords: Iterable[str] | None = None):
+        self.keyword_file = keyword_file
+        self._lock = threading.Lock()
+        self._keywords = set(default_keywords or set())
+        self._load()
+        self._matcher = KeywordMatcher(self._keywords)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.keyword_file):
+            self._save()
+            return
+        try:
+            with open(self.keyword_file, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            loaded = payload.get("keywords", [])
+            if isinstance(loaded, list):
+                loaded_set = {str(item).strip() for item in loaded if str(item).strip()}
+                # 과거 기본 키워드가 파일에 남아있어도 자동 제거
+                self._keywords = loaded_set - LEGACY_DEFAULT_KEYWORDS
+                if loaded_set != self._keywords:
+                    self._save()
+        except Exception as exc:
+            logging.warning("키워드 파일 로드 실패: %s", exc)
+
+    def _save(self) -> None:
+        with open(self.keyword_file, "w", encoding="utf-8") as f:
+            json.dump({"keywords": sorted(self._keywords)}, f, ensure_ascii=False, indent=2)
+
+    def list_keywords(self) -> List[str]:
+        with self._lock:
+            return sorted(self._keywords)
+
+    def add(self, keyword: str) -> bool:
+        keyword = keyword.strip()
+        if not keyword:
+            return False
+        with self._lock:
+            before = len(self._keywords)
+            self._keywords.add(keyword)
+            changed = len(self._keywords) > before
+            if changed:
+                self._save()
+                self._matcher = KeywordMatcher(self._keywords)
+            return changed
+
+    def remove(self, keyword: str) -> bool:
+        keyword = keyword.strip()
+        with self._lock:
+            if keyword not in self._keywords:
+                return False
+            self._keywords.remove(keyword)
+            self._save()
+            self._matcher = KeywordMatcher(self._keywords)
+            return True
+
+    def matched_keywords(self, text: str) -> List[str]:
+        # 매처는 변경 시 통째로 교체되므로 잠금 없이 현재 참조만 읽으면 된다
+        return self._matcher.search(text)
+
+
+# 숫자 한 덩어리와 한글 단위. 점 뒤에 숫자가 정확히 세 자리면 천 단위 구분자로 본다 ("12.900원")
+AMOUNT_RE = re.compile(r"\s*(\d+(?:[,.]\d{3}(?!\d))*)(\.\d+)?\s*(천만|백만|억|만|천|백)?")
+AMOUNT_UNITS = {"억": 100_000_000, "천만": 10_000_000, "백만": 1_000_000, "만": 10_000, "천": 1_000, "백": 100}
+FREE_RE = re.compile(r"무료|free", re.IGNORECASE)
+FOREIGN_CURRENCY_RE = re.compile(r"US\$|\$|€|£|¥|USD|EUR|JPY|CNY|달러|유로|엔|위안|파운드", re.IGNORECASE)
+TITLE_SELLER_RE = re.compile(r"^\s*\[([^\]]+)\]")
+TITLE_PRICE_RE = re.compile(r"\(([^()]*\d[^()]*)\)\s*$")
+
+
+def parse_amount(text: Optional[str]) -> Optional[int]:
+    """가격/배송비 자유 문자열에서 원 단위 금액을 뽑는다 ("₩12,900" -> 12900, "무료배송" -> 0, "1.2만원" -> 12000).
+
+    "2만9천원"처럼 큰 단위부터 이어지는 덩어리는 더한다 (29000). 첫 숫자보다 "무료"가 먼저 나오면
+    0으로 본다 ("3,000원 (3만원 이상 무료)"는 3000). 첫 금액이 달러/엔 등 외화로 표시되어 있으면
+    원과 비교할 수 없으므로 None이다 (가격 조건은 거짓, 가격 이력에는 남기지 않는다).
+    """
+    if not text:
+        return None
+    m = AMOUNT_RE.search(text)
+    free = FREE_RE.search(text)
+    if free and (m is None or free.start() < m.start()):
+        return 0
+    if m is None:
+        return None
+    if FOREIGN_CURRENCY_RE.search(text[max(0, m.start() - 4) : m.start()]):
+        return None
+    total = 0.0
+    last_scale: Optional[int] = None
+    while m:
+        value = int(re.sub(r"[,.]", "", m.group(1))) + float(m.group(2) or 0)
+        scale = AMOUNT_UNITS[m.group(3)] if m.group(3) else 1
+        if last_scale is not None and (scale >= last_scale or value * scale >= last_scale):
+            break
+        total += value * scale
+        end = m.end()
+        if scale == 1:
+            break
+        last_scale = scale
+        m = AMOUNT_RE.match(text, end)
+    if FOREIGN_CURRENCY_RE.match(text[end:].lstrip()):
+        return None
+    return int(round(total))
+
+
+def title_listing_fields(title: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    # 알구몬 형식 제목 "[쿠팡] 상품명 (12,900원/무료)"에서 (판매처, 가격, 배송) 문자열
+    seller = TITLE_SELLER_RE.match(title)
+    paren = TITLE_PRICE_RE.search(title)
+    price, _, shipping = paren.group(1).partition("/") if paren else (None, "", "")
+    return (seller.group(1).strip() if seller else None), price, (shipping or None)
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+class _RuleContext:
+    """규칙 하나를 평가할 때 쓰는 딜 정보. partial이면 상세 정보 없이 목록(제목)만 본 1단계다."""
+
+    __slots__ = ("hits", "haystack", "title", "seller", "price", "shipping", "partial")
+
+    def __init__(self, hits: set[str], haystack: str, title: str, deal: Optional[dict]):
+        listing_seller, listing_price, listing_shipping = title_listing_fields(title)
+        self.partial = deal is None
+        deal = deal or {}
+        self.hits = hits
+        self.haystack = haystack
+        self.title = title.lower()
+        # 상세 필드가 없으면 제목의 [판매처]/(가격/배송)으로 대신한다
+        seller = deal.get("seller") or listing_seller
+        self.seller = seller.lower() if seller else None
+        self.price = parse_amount(deal.get("price")) if deal.get("price") else parse_amount(listing_price)
+        self.shipping = parse_amount(deal.get("shipping")) if deal.get("shipping") else parse_amount(listing_shipping)
+
+
+# 평가 함수는 True/False, 또는 1단계에서 아직 알 수 없으면 None을 돌려준다 (3값 논리)
+RuleFn = Callable[[_RuleContext], Optional[bool]]
+
+
+class CompiledRule:
+    """규칙 식 하나를 파싱해서 평가 함수로 컴파일한 것.
+
+    문법: 공백=AND, OR 또는 |, -단어/NOT 단어=제외, (괄호), "여러 단어", /정규식/,
+    seller:쿠팡 / title:단어 (필드 한정), price<30000 / shipping=0 / 가격<=3만 (숫자 조건).
+    anchors는 이 규칙이 참이 되려면 본문에 적어도 하나는 있어야 하는 단어들이다 (없으면 None).
+    """
+
+    FIELD_ALIASES = {
+        "price": "price",
+        "가격": "price",
+        "shipping": "shipping",
+        "배송": "shipping",
+        "배송비": "shipping",
+        "seller": "seller",
+        "판매처": "seller",
+        "title": "title",
+        "제목": "title",
+    }
+    COMPARE_RE = re.compile(r"^([^\s<>=!:]+)(<=|>=|!=|<|>|=)(.+)$")
+    COMPARE_OPS: dict[str, Callable[[int, int], bool]] = {
+        "<": lambda a, b: a < b,
+        "<=": lambda a, b: a <= b,
+        ">": lambda a, b: a > b,
+        ">=": lambda a, b: a >= b,
+        "=": lambda a, b: a == b,
+        "!=": lambda a, b: a != b,
+    }
+
+    def __init__(self, name: str, expression: str):
+        self.name = name
+        self.expression = expression.strip()
+        self.literals: set[str] = set()
+        self.seller_literals: set[str] = set()
+        self._tokens = self._tokenize(self.expression)
+        self._pos = 0
+        if not self._tokens:
+            raise RuleSyntaxError("규칙 식이 비어 있습니다.")
+        self.evaluate, self.anchors = self._parse_or()
+        if self._pos != len(self._tokens):
+            raise RuleSyntaxError(f"해석할 수 없는 부분: {' '.join(self._tokens[self._pos:])}")
+
+    @staticmethod
+    def _tokenize(expression: str) -> List[str]:
+        tokens = []
+        i = 0
+        while i < len(expression):
+            ch = expression[i]
+            if ch.isspace():
+                i += 1
+            elif ch in "()|":
+                tokens.append(ch)
+                i += 1
+            elif ch == "-" and i + 1 < len(expression) and not expression[i + 1].isspace():
+                tokens.append("-")
+                i += 1
+            elif ch in "\"/":
+                end = expression.find(ch, i + 1)
+                while end > 0 and expression[end - 1] == "\\":
+                    end = expression.find(ch, end + 1)
+                if end < 0:
+                    raise RuleSyntaxError(f"닫히지 않은 {ch}")
+                tokens.append(expression[i : end + 1])
+                i = end + 1
+            else:
+                j = i
+                while j < len(expression) and not expression[j].isspace() and expression[j] not in "()|":
+                    # field:"여러 단어"는 한 토큰
+                    if expression[j] == '"':
+                        end = expression.find('"', j + 1)
+                        if end < 0:
+                            raise RuleSyntaxError('닫히지 않은 "')
+                        j = end
+                    j += 1
+                tokens.append(expression[i:j])
+                i = j
+        return tokens
+
+    def _peek(self) -> Optional[str]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _parse_or(self) -> tuple[RuleFn, Optional[frozenset[str]]]:
+        branches = [self._parse_and()]
+        while self._peek() in ("OR", "|"):
+            self._pos += 1
+            branches.append(self._parse_and())
+        if len(branches) == 1:
+            return branches[0]
+        fns = [fn for fn, _ in branches]
+        anchors = None if any(a is None for _, a in branches) else frozenset().union(*(a for _, a in branches))
+
+        def any_of(ctx: _RuleContext) -> Optional[bool]:
+            result: Optional[bool] = False
+            for fn in fns:
+                value = fn(ctx)
+                if value:
+                    return True
+                if value is None:
+                    result = None
+            return result
+
+        return any_of, anchors
+
+    def _parse_and(self) -> tuple[RuleFn, Optional[frozenset[str]]]:
+        parts = [self._parse_unary()]
+        while self._peek() not in (None, ")", "OR", "|"):
+            if self._peek() == "AND":
+                self._pos += 1
+            parts.append(self._parse_unary())
+        if len(parts) == 1:
+            return parts[0]
+        # 앵커는 자식 중 단어 수가 가장 적은(같으면 단어가 가장 긴) 집합 하나로 충분하다
+        fns = [fn for fn, _ in parts]
+        candidates = [a for _, a in parts if a is not None]
+        anchors = min(candidates, key=lambda a: (len(a), -max(map(len, a)))) if candidates else None
+
+        def all_of(ctx: _RuleContext) -> Optional[bool]:
+            result: Optional[bool] = True
+            for fn in fns:
+                value = fn(ctx)
+                if value is False:
+                    return False
+                if value is None:
+                    result = None
+            return result
+
+        return all_of, anchors
+
+    def _parse_unary(self) -> tuple[RuleFn, Optional[frozenset[str]]]:
+        token = self._peek()
+        if token in ("-", "NOT"):
+            self._pos += 1
+            inner, _ = self._parse_unary()
+
+            def negate(ctx: _RuleContext) -> Optional[bool]:
+                value = inner(ctx)
+                return None if value is None else not value
+
+            return negate, None
+        if token == "(":
+            self._pos += 1
+            result = self._parse_or()
+            if self._peek() != ")":
+                raise RuleSyntaxError("닫히지 않은 (")
+            self._pos += 1
+            return result
+        if token is None or token in (")", "OR", "|", "AND"):
+            raise RuleSyntaxError(f"조건이 와야 할 자리: {token or '식의 끝'}")
+        self._pos += 1
+        return self._compile_term(token)
+
+    def _compile_term(self, token: str) -> tuple[RuleFn, Optional[frozenset[str]]]:
+        m = self.COMPARE_RE.match(token)
+        if m and self.FIELD_ALIASES.get(m.group(1).lower()) in ("price", "shipping"):
+            field_name = self.FIELD_ALIASES[m.group(1).lower()]
+            op = self.COMPARE_OPS[m.group(2)]
+            limit = parse_amount(m.group(3))
+            if limit is None:
+                raise RuleSyntaxError(f"금액을 읽을 수 없습니다: {token}")
+
+            def compare(ctx: _RuleContext) -> Optional[bool]:
+                value = ctx.price if field_name == "price" else ctx.shipping
+                if value is None:
+                    return None if ctx.partial else False
+                return op(value, limit)
+
+            return compare, None
+
+        field_name = None
+        head, sep, rest = token.partition(":")
+        if sep and rest and self.FIELD_ALIASES.get(head.lower()) in ("seller", "title"):
+            field_name, token = self.FIELD_ALIASES[head.lower()], rest
+        if len(token) > 2 and token[0] == token[-1] == "/":
+            try:
+                pattern = re.compile(token[1:-1], re.IGNORECASE)
+            except re.error as exc:
+                raise RuleSyntaxError(f"정규식 오류 {token}: {exc}") from exc
+
+            def regex(ctx: _RuleContext) -> Optional[bool]:
+                text = ctx.haystack if field_name is None else ctx.title if field_name == "title" else ctx.seller
+                if text is None:
+                    return None if ctx.partial else False
+                return pattern.search(text) is not None
+
+            return regex, None
+
+        literal = (token[1:-1] if len(token) > 1 and token[0] == token[-1] == '"' else token).lower()
+        if not literal:
+            raise RuleSyntaxError("빈 단어")
+        if field_name == "seller":
+            self.seller_literals.add(literal)
+
+            def seller(ctx: _RuleContext) -> Optional[bool]:
+                if ctx.seller is None:
+                    return None if ctx.partial else False
+                return literal in ctx.seller
+
+            return seller, frozenset((literal,))
+        if field_name == "title":
+            return (lambda ctx: literal in ctx.title), frozenset((literal,))
+        # 필드 한정이 없는 단어는 묶음 매처가 한 번에 찾아 둔 결과로 판정한다
+        self.literals.add(literal)
+        return (lambda ctx: literal in ctx.hits), frozenset((literal,))
+
+
+class RuleEngine:
+    """컴파일된 규칙 묶음. 딜마다 모든 규칙을 돌리지 않고, 단어 색인으로 후보 규칙만 평가한다.
+
+    모든 규칙의 단어를 하나의 KeywordMatcher로 묶어 본문을 한 번 훑고, 걸린 단어에 묶인 규칙과
+    앵커가 없는 규칙(숫자 조건/정규식/제외어만 있는 규칙)만 평가하므로, 비용은 전체 규칙 수가 아니라
+    같은 단어를 공유하는 규칙 수에 비례한다. 생성 후에는 불변이라 잠금 없이 공유할 수 있다.
+    """
+
+    def __init__(self, rules: Iterable[CompiledRule]):
+        self.rules = list(rules)
+        literals: set[str] = set()
+        self._index: dict[str, List[int]] = {}
+        self._unanchored: List[int] = []
+        # 판매처 단어가 앵커인 규칙. 목록 단계에서는 판매처가 보통 상세 페이지에만 있어서 앵커로 거를 수 없다
+        self._seller_anchored: List[int] = []
+        for i, rule in enumerate(self.rules):
+            literals |= rule.literals
+            if rule.anchors is None:
+                self._unanchored.append(i)
+                continue
+            if rule.anchors & rule.seller_literals:
+                self._seller_anchored.append(i)
+            for anchor in rule.anchors:
+                literals.add(anchor)
+                self._index.setdefault(anchor, []).append(i)
+        self._matcher = KeywordMatcher(literals)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def evaluate_batch(self, items: Iterable[tuple[str, Optional[dict]]]) -> List[List[str]]:
+        """(제목, 상세 필드) 묶음을 평가해서 항목마다 걸린 규칙 이름 목록을 돌려준다.
+
+        상세 필드가 None이면 목록 단계 평가로, 제목만 보고 아직 참이 될 수 있는 규칙도 포함한다.
+        """
+        results = []
+        for title, deal in items:
+            if not self.rules:
+                results.append([])
+                continue
+            haystack = HotdealBot.build_keyword_haystack(title, deal or {}).lower()
+            hits = set(self._matcher.search(haystack))
+            candidates = set(self._unanchored)
+            for literal in hits:
+                candidates.update(self._index.get(literal, ()))
+            ctx = _RuleContext(hits, haystack, title, deal)
+            if ctx.partial and ctx.seller is None:
+                candidates.update(self._seller_anchored)
+            results.append(
+                [self.rules[i].name for i in sorted(candidates) if self.rules[i].evaluate(ctx) is not False]
+                if ctx.partial
+                else [self.rules[i].name for i in sorted(candidates) if self.rules[i].evaluate(ctx)]
+            )
+        return results
+
+
+class RuleManager:
+    """이름 -> 규칙 식을 파일에 보관하고, 바뀔 때마다 RuleEngine을 새로 컴파일해서 통째로 교체한다."""
+
+    def __init__(self, rule_file: str):
+        self.rule_file = rule_file
+        self._lock = threading.Lock()
+        self._rules: dict[str, str] = {}
+        self._load()
+        self.engine = self._compile(self._rules)
+
+    @staticmethod
+    def _compile(rules: dict[str, str]) -> RuleEngine:
+        return RuleEngine(CompiledRule(name, expression) for name, expression in sorted(rules.items()))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.rule_file):
+            return
+        try:
+            with open(self.rule_file, "r", encoding="utf-8") as f:
+                loaded = json.load(f).get("rules", {})
+        except Exception as exc:
+            logging.warning("규칙 파일 로드 실패: %s", exc)
+            return
+        for name, expression in loaded.items():
+            try:
+                CompiledRule(name, expression)
+            except RuleSyntaxError as exc:
+                logging.warning("규칙 [%s] 무시: %s", name, exc)
+                continue
+            self._rules[str(name)] = str(expression)
+
+    def _save(self) -> None:
+        with open(self.rule_file, "w", encoding="utf-8") as f:
+            json.dump({"rules": dict(sorted(self._rules.items()))}, f, ensure_ascii=False, indent=2)
+
+    def list_rules(self) -> List[tuple[str, str]]:
+        with self._lock:
+            return sorted(self._rules.items())
+
+    def add(self, name: str, expression: str) -> bool:
+        # 같은 이름이 있으면 바꾼다. 문법 오류는 RuleSyntaxError
+        name, expression = name.strip(), expression.strip()
+        if not name or not expression:
+            return False
+        CompiledRule(name, expression)
+        with self._lock:
+            if self._rules.get(name) == expression:
+                return False
+            rules = {**self._rules, name: expression}
+            self.engine = self._compile(rules)
+            self._rules = rules
+            self._save()
+        return True
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            if name.strip() not in self._rules:
+                return False
+            rules = dict(self._rules)
+            del rules[name.strip()]
+            self.engine = self._compile(rules)
+            self._rules = rules
+            self._save()
+        return True
+
+    def matched_rules(self, title: str, deal: Optional[dict]) -> List[str]:
+        return self.engine.evaluate_batch([(title, deal)])[0]
+
+
+def resolve_parser_backend(name: str) -> str:
+    # 선택한 빌더가 설치되어 있지 않으면 기준 구현으로 대체
+    if name != HTML_PARSER_BACKENDS[0] and builder_registry.lookup(name) is None:
+        logging.warning("HTML 파서 %s를 사용할 수 없어 %s로 대체합니다.", name, HTML_PARSER_BACKENDS[0])
+        return HTML_PARSER_BACKENDS[0]
+    return name
+
+
+@dataclass(frozen=True)
+class DealExtractorSpec:
+    """단일 순회 추출기용으로 미리 풀어 둔 선택자. 선택자 키는 "tag:article" / ".content" 형태다."""
+
+    # (앵커 클래스, 조상 선택자 키) 우선순위 순
+    origin_rules: tuple[tuple[Optional[str], Optional[str]], ...]
+    row_key: tuple[str, ...]
+    row_value: tuple[str, ...]
+    content: tuple[str, ...]
+    aliases: tuple[tuple[str, tuple[str, ...]], ...]
+
+
+ORIGIN_SELECTOR_RE = re.compile(r"^(?:([a-z][a-z0-9]*|\.[\w-]+)\s+)?a(\.[\w-]+)?\[href\]$")
+SIMPLE_SELECTOR_RE = re.compile(r"^(?:[a-z][a-z0-9]*|\.[\w-]+)$")
+
+
+def _selector_key(selector: str) -> str:
+    return selector if selector.startswith(".") else f"tag:{selector}"
+
+
+def _split_selector_keys(keys: Iterable[str]) -> tuple[frozenset[str], frozenset[str]]:
+    keys = tuple(keys)
+    return (
+        frozenset(key[4:] for key in keys if key.startswith("tag:")),
+        frozenset(key[1:] for key in keys if key.startswith(".")),
+    )
+
+
+def compile_extractor_spec(adapter: "SourceAdapter") -> Optional[DealExtractorSpec]:
+    # 태그/클래스 하나짜리 선택자와 "[조상] a[.클래스][href]"만 지원한다. 그 밖의 선택자는 soup 경로로 처리한다
+    origin_rules = []
+    for selector in adapter.ORIGIN_LINK_SELECTORS:
+        m = ORIGIN_SELECTOR_RE.match(selector.strip())
+        if not m:
+            return None
+        anchor_class = m.group(2)[1:] if m.group(2) else None
+        origin_rules.append((anchor_class, _selector_key(m.group(1)) if m.group(1) else None))
+
+    groups = []
+    row_key, row_value = adapter.ROW_KEY_SELECTOR.split(","), adapter.ROW_VALUE_SELECTOR.split(",")
+    for group in (row_key, row_value, adapter.CONTENT_SELECTORS):
+        selectors = [selector.strip() for selector in group]
+        if not all(SIMPLE_SELECTOR_RE.match(selector) for selector in selectors):
+            return None
+        groups.append(tuple(map(_selector_key, selectors)))
+    aliases = tuple(
+        (field_name, tuple(label.lower() for label in labels)) for field_name, labels in adapter.FIELD_ALIASES.items()
+    )
+    return DealExtractorSpec(tuple(origin_rules), *groups, aliases)
+
+
+class _TextCapture:
+    # container: 요소 자신이 문자열 컨테이너 태그(script 등)이면 그 이름. get_text는 같은 종류의 문자열만 모은다
+    __slots__ = ("pieces", "closed", "container")
+
+    def __init__(self, container: Optional[str]) -> None:
+        self.pieces: List[str] = []
+        self.closed = False
+        self.container = container
+
+    def text(self) -> str:
+        return SourceAdapter.clean_text(" ".join(self.pieces))
+
+
+class _Row:
+    __slots__ = ("seq", "key", "value", "value_href")
+
+    def __init__(self, seq: int) -> None:
+        self.seq = seq
+        self.key: Optional[_TextCapture] = None
+        self.value: Optional[_TextCapture] = None
+        self.value_href: Optional[str] = None
+
+
+class DealFieldExtractor:
+    """deal_fields_from_soup(BeautifulSoup 기준 구현)과 같은 결과를 태그 이벤트 한 번의 순회로 만든다.
+
+    이벤트는 scan_html()이 넣어 준다. 선택자 결과가 같도록 html.parser 트리 규칙(빈 요소는 바로 닫힘,
+    종료 태그는 가장 가까운 같은 이름의 요소까지 닫음)과 문자열 종류 규칙(script/style/template/rt/rp
+    안의 문자열은 가장 가까운 그 태그의 종류가 되고, get_text는 자기와 같은 종류만 모음)을 따른다.
+    더 앞선 후보가 나올 수 없을 때만 필드를 확정하고, 모두 확정되면 done이 되어 나머지 문서를 읽지 않는다.
+    """
+
+    CONTENT_LIMIT = 220
+    VOID_TAGS = frozenset(
+        "area base br col embed hr img input keygen link menuitem meta param source track wbr "
+        "basefont bgsound command frame image isindex nextid spacer".split()
+    )
+    STRING_CONTAINER_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+
+    def __init__(self, spec: DealExtractorSpec, page_url: str, base_host: str):
+        self.spec = spec
+        self.page_url = page_url
+        self.base_host = base_host
+        self.done = False
+        # 표 필드와 본문은 더 바뀌지 않음 (출처 링크는 더 앞선 선택자의 후보가 뒤에 나올 수 있다)
+        self.settled = False
+        # 출처 링크만 남았고 남은 후보가 앵커 클래스로만 정해지면 그 클래스 이름들 (scan_html이 나머지 문서에서 찾아본다)
+        self.pending_anchor_classes: Optional[frozenset[str]] = None
+
+        self._key_tags, self._key_classes = _split_selector_keys(spec.row_key)
+        self._value_tags, self._value_classes = _split_selector_keys(spec.row_value)
+        self._content_tags, self._content_classes = _split_selector_keys(spec.content)
+        self._watch_tags = self._key_tags | self._value_tags | self._content_tags
+        self._watch_classes = self._key_classes | self._value_classes | self._content_classes
+        self._tracked_tags, self._tracked_classes = _split_selector_keys(
+            ancestor for _, ancestor in spec.origin_rules if ancestor
+        )
+        self._open_ancestors: dict[str, int] = {}
+        # 요소 스택: (태그, 열린 조상 키, 이 요소에서 시작한 텍스트 캡처, 행)
+        self._stack: List[tuple] = []
+        self._captures: List[_TextCapture] = []
+        self._text: List[str] = []
+        self._containers: List[str] = []
+        self._closed_void: dict[str, int] = {}
+        self._origin: Optional[str] = None
+        self._origin_rank = len(spec.origin_rules)
+        self._open_rows: List[_Row] = []
+        self._row_seq = 0
+        self._fields: dict[str, tuple[int, str]] = {}
+        self._row_origin: Optional[tuple[int, str]] = None
+        self._content: List[Optional[_TextCapture]] = [None] * len(spec.content)
+
+    # ---- 이벤트 ----
+    def data(self, text: str) -> None:
+        self._text.append(text)
+
+    def boundary(self) -> None:
+        # 주석/선언처럼 텍스트 노드를 끊는 토큰
+        if self._text:
+            self._flush_text()
+
+    def cdata(self, text: str) -> None:
+        # CDATA 구간은 컨테이너 태그 안에서도 일반 본문 문자열로 취급된다
+        self.boundary()
+        text = text.strip()
+        if text:
+            for capture in self._captures:
+                if capture.container is None:
+                    capture.pieces.append(text)
+
+    def start(self, tag: str, attrs: dict, self_closing: bool = False) -> None:
+        if self._text:
+            self._flush_text()
+        classes = attrs["class"].split() if "class" in attrs else ()
+        if tag == "a" and "href" in attrs:
+            self._on_anchor(attrs["href"], classes)
+
+        capture = None
+        if tag in self._watch_tags or (classes and not self._watch_classes.isdisjoint(classes)):
+            capture = self._start_capture(tag, classes)
+        keys: tuple = ()
+        if tag in self._tracked_tags or (classes and not self._tracked_classes.isdisjoint(classes)):
+            keys = tuple(
+                [f"tag:{tag}"] * (tag in self._tracked_tags) + [f".{c}" for c in classes if c in self._tracked_classes]
+            )
+            for key in keys:
+                self._open_ancestors[key] = self._open_ancestors.get(key, 0) + 1
+        row = None
+        if tag == "tr":
+            self._row_seq += 1
+            row = _Row(self._row_seq)
+            self._open_rows.append(row)
+        if tag in self.STRING_CONTAINER_TAGS:
+            self._containers.append(tag)
+        self._stack.append((tag, keys, capture, row))
+        if self_closing:
+            self._pop_frame()
+        elif tag in self.VOID_TAGS:
+            self._pop_frame()
+            # 나중에 나오는 </br> 같은 종료 태그는 텍스트도 끊지 않고 한 번 무시된다
+            self._closed_void[tag] = self._closed_void.get(tag, 0) + 1
+
+    def end(self, tag: str) -> None:
+        if self._closed_void.get(tag):
+            self._closed_void[tag] -= 1
+            return
+        if self._text:
+            self._flush_text()
+        stack = self._stack
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == tag:
+                while len(stack) > i:
+                    self._pop_frame()
+                if not self._open_rows:
+                    self._check_done()
+                return
+
+    def close(self) -> dict:
+        if self._text:
+            self._flush_text()
+        while self._stack:
+            self._pop_frame()
+        return self.result()
+
+    # ---- 내부 ----
+    def _flush_text(self) -> None:
+        text = "".join(self._text).strip()
+        self._text.clear()
+        if text:
+            container = self._containers[-1] if self._containers else None
+            for capture in self._captures:
+                if capture.container == container:
+                    capture.pieces.append(text)
+
+    def _start_capture(self, tag: str, classes: Any) -> Optional[_TextCapture]:
+        # 각 행의 첫 키/값 셀과 각 본문 선택자의 첫 요소를 잡는다. 한 요소가 여러 역할이면 캡처를 같이 쓴다
+        capture = None
+        container = tag if tag in self.STRING_CONTAINER_TAGS else None
+        is_key = tag in self._key_tags or any(c in self._key_classes for c in classes)
+        is_value = tag in self._value_tags or any(c in self._value_classes for c in classes)
+        for row in self._open_rows:
+            if is_key and row.key is None:
+                row.key = capture = capture or _TextCapture(container)
+            if is_value and row.value is None:
+                row.value = capture = capture or _TextCapture(container)
+        if tag in self._content_tags or any(c in self._content_classes for c in classes):
+            for i, selector in enumerate(self.spec.content):
+                if self._content[i] is not None:
+                    continue
+                if selector[4:] == tag if selector.startswith("tag:") else selector[1:] in classes:
+                    self._content[i] = capture = capture or _TextCapture(container)
+        if capture is not None:
+            self._captures.append(capture)
+        return capture
+
+    def _on_anchor(self, href: str, classes: Any) -> None:
+        href = href.strip()
+        for row in self._open_rows:
+            if row.value is not None and not row.value.closed and row.value_href is None:
+                row.value_href = href
+        if not href:
+            return
+        # 지금까지 찾은 것보다 앞선 선택자에 걸리는 앵커만 본다 (같은 순위면 먼저 나온 앵커가 이긴다)
+        for rank in range(self._origin_rank):
+            anchor_class, ancestor = self.spec.origin_rules[rank]
+            if anchor_class is not None and anchor_class not in classes:
+                continue
+            if ancestor is not None and not self._open_ancestors.get(ancestor):
+                continue
+            abs_url = urljoin(self.page_url, href)
+            if SourceAdapter.is_external_link(abs_url, self.base_host):
+                self._origin = abs_url
+                self._origin_rank = rank
+            return
+
+    def _pop_frame(self) -> None:
+        tag, keys, capture, row = self._stack.pop()
+        for key in keys:
+            self._open_ancestors[key] -= 1
+        if capture is not None:
+            capture.closed = True
+            self._captures.remove(capture)
+        if tag in self.STRING_CONTAINER_TAGS:
+            self._containers.pop()
+        if row is not None:
+            self._open_rows.remove(row)
+            self._finish_row(row)
+
+    def _finish_row(self, row: _Row) -> None:
+        if row.key is None or row.value is None:
+            return
+        key_text = row.key.text().lower()
+        value_text = row.value.text()
+        if not value_text:
+            return
+        for field_name, labels in self.spec.aliases:
+            if not any(label in key_text for label in labels):
+                continue
+            if field_name == "origin_link":
+                if self._row_origin is None or row.seq < self._row_origin[0]:
+                    value = value_text
+                    if row.value_href is not None:
+                        abs_url = urljoin(self.page_url, row.value_href)
+                        if SourceAdapter.is_external_link(abs_url, self.base_host):
+                            value = abs_url
+                    self._row_origin = (row.seq, value)
+            elif field_name not in self._fields or row.seq < self._fields[field_name][0]:
+                self._fields[field_name] = (row.seq, value_text)
+
+    def _content_snippet(self, final: bool) -> Optional[str]:
+        # 앞선 선택자부터: 닫혔는데 비어 있으면 다음 선택자로, 아직 열려 있으면 이미 충분히 길 때만 확정한다.
+        # final이 아니면 아직 확정할 수 없을 때 None, 모든 선택자가 비었으면 ""를 돌려준다
+        for capture in self._content:
+            if capture is None:
+                if final:
+                    continue
+                return None
+            snippet = capture.text()
+            if capture.closed or final:
+                if snippet:
+                    return snippet[: self.CONTENT_LIMIT]
+                continue
+            return snippet[: self.CONTENT_LIMIT] if len(snippet) > self.CONTENT_LIMIT else None
+        return None if final else ""
+
+    def _check_done(self) -> None:
+        # 열린 행이 없을 때만 부른다: 이후에 나오는 행은 항상 순서가 뒤라서 이미 찾은 필드를 바꾸지 못한다
+        if not self.settled:
+            if any(name not in self._fields for name, _ in self.spec.aliases if name != "origin_link"):
+                return
+            if self._content_snippet(final=False) is None:
+                return
+            self.settled = True
+        if self._origin_rank == 0:
+            self.done = True
+            return
+        pending = self.spec.origin_rules[: self._origin_rank]
+        if all(anchor_class and not ancestor for anchor_class, ancestor in pending):
+            self.pending_anchor_classes = frozenset(anchor_class for anchor_class, _ in pending)
+
+    def result(self) -> dict:
+        origin = self._origin
+        if origin is None and self._row_origin is not None:
+            origin = self._row_origin[1]
+        return {
+            "origin_link": origin,
+            "price": self._fields.get("price", (0, None))[1],
+            "shipping": self._fields.get("shipping", (0, None))[1],
+            "seller": self._fields.get("seller", (0, None))[1],
+            "content": self._content_snippet(final=not self.done) or None,
+        }
+
+
+# html.parser(파이썬 표준 라이브러리)의 시작 태그/속성 문법을 그대로 옮긴 것
+HTML_TOKEN_RE = re.compile(
+    r"<(?:"
+    r"/(?P<end>[a-zA-Z][^\t\n\r\f />\x00]*)[^>]*>"
+    r"|(?P<tag>[a-zA-Z][^\t\n\r\f />\x00]*)"
+    r"(?P<attrs>(?:[\s/]*(?:(?<=['\"\s/])[^\s/>][^\s/=>]*)(?:\s*=+\s*(?:'[^']*'|\"[^\"]*\"|(?!['\"])[^>\s]*))?(?:\s|/(?!>))*)*)"
+    r"\s*(?P<self_closing>/?)>"
+    r"|!--.*?--\s*>|!\[CDATA\[(?P<cdata>.*?)\]\s*\]\s*>|![^>]*>|\?[^>]*>)",
+    re.DOTALL,
+)
+HTML_ATTR_RE = re.compile(r"""((?<=['"\s/])[^\s/>][^\s/=>]*)(?:\s*=+\s*('[^']*'|"[^"]*"|(?!['"])[^>\s]*))?""")
+RAW_TEXT_END_RE = {tag: re.compile(rf"</\s*{tag}\s*>", re.IGNORECASE) for tag in ("script", "style")}
+
+
+def parse_html_attrs(markup: str, start: int, end: int) -> dict:
+    # 값 없는 속성은 "", 같은 속성이 여러 번 나오면 마지막 값 (BeautifulSoup과 같음)
+    attrs = {}
+    for m in HTML_ATTR_RE.finditer(markup, start, end):
+        value = m.group(2) or ""
+        if value[:1] == value[-1:] and value[:1] in ("'", '"') and len(value) > 1:
+            value = value[1:-1]
+        attrs[m.group(1).lower()] = html_unescape(value) if "&" in value else value
+    return attrs
+
+
+class HtmlEventScanner:
+    """정규식으로 태그를 훑어 DealFieldExtractor에 이벤트를 넣는다. 문서를 조각으로 나눠 넣어도 결과가 같다.
+
+    토큰이 조각 경계에 걸리면 다음 조각이 올 때까지 버퍼에 남겨 둔다. 추출기는 class/href만 보므로
+    그 밖의 속성은 풀지 않는다.
+    """
+
+    TOKEN_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ/!?")
+
+    def __init__(self, extractor: DealFieldExtractor):
+        self.extractor = extractor
+        self._buffer = ""
+        self._pos = 0
+        self._raw_tag: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.extractor.done
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += text
+        self._scan(final)
+        return self.extractor.done
+
+    def close(self) -> dict:
+        if not self.extractor.done:
+            self.feed("", final=True)
+        return self.extractor.close()
+
+    def _scan(self, final: bool) -> None:
+        markup = self._buffer
+        length = len(markup)
+        extractor = self.extractor
+        pos = self._pos
+        pending_checked_until = -1
+        while pos < length and not extractor.done:
+            if self._raw_tag is not None:
+                # script/style 본문은 엔티티를 풀지 않은 그대로의 문자열이다
+                closing = RAW_TEXT_END_RE[self._raw_tag].search(markup, pos)
+                if closing is None and not final:
+                    break
+                extractor.data(markup[pos : closing.start() if closing else length])
+                pos = closing.end() if closing else length
+                extractor.end(self._raw_tag)
+                self._raw_tag = None
+                continue
+            if final and extractor.pending_anchor_classes is not None and pos > pending_checked_until:
+                # 문서 전체가 버퍼에 있을 때: 출처 링크 후보 클래스가 남은 부분에 없으면 더 볼 것이 없다
+                found = [markup.find(name, pos) for name in extractor.pending_anchor_classes]
+                found = [index for index in found if index >= 0]
+                if not found:
+                    extractor.done = True
+                    break
+                pending_checked_until = min(found)
+            start = markup.find("<", pos)
+            if start < 0:
+                if not final:
+                    break
+                start = length
+            m = HTML_TOKEN_RE.match(markup, start) if start < length else None
+            if m is None:
+                # 완성되지 않은 토큰은 다음 조각을 기다리고, 토큰이 될 수 없는 "<"는 글자로 취급한다
+                if not final and start < length and (start + 1 >= length or markup[start + 1] in self.TOKEN_START):
+                    break
+                pos, text = min(start + 1, length), markup[pos : start + 1]
+                extractor.data(html_unescape(text) if "&" in text else text)
+                continue
+            if not final and m.end() >= length:
+                # 버퍼 끝에 닿은 토큰은 뒤 조각에서 더 길어질 수 있다
+                break
+            if start > pos:
+                text = markup[pos:start]
+                extractor.data(html_unescape(text) if "&" in text else text)
+            pos = m.end()
+            self._token(m)
+        self._pos = pos
+
+    def _token(self, m: "re.Match[str]") -> None:
+        extractor = self.extractor
+        tag = m.group("tag")
+        if tag is None:
+            if m.group("end"):
+                extractor.end(m.group("end").lower())
+            elif m.group("cdata") is not None:
+                extractor.cdata(m.group("cdata"))
+            else:
+                # 주석/선언/처리 명령은 텍스트를 끊기만 한다
+                extractor.boundary()
+            return
+        tag = tag.lower()
+        start, end = m.span("attrs")
+        raw = m.string[start:end].lower()
+        attrs = parse_html_attrs(m.string, start, end) if "class" in raw or "href" in raw else {}
+        self_closing = bool(m.group("self_closing"))
+        extractor.start(tag, attrs, self_closing)
+        if tag in RAW_TEXT_END_RE and not self_closing:
+            self._raw_tag = tag
+
+
+def scan_html(markup: str, extractor: DealFieldExtractor) -> dict:
+    scanner = HtmlEventScanner(extractor)
+    scanner.feed(markup, final=True)
+    return scanner.close()
+
+
+def sniff_charset(header_charset: Optional[str], head: bytes) -> str:
+    # Content-Type 헤더 > BOM > 앞부분의 <meta charset> > utf-8 (aiohttp resp.text()의 기본값과 같음)
+    if head.startswith(codecs.BOM_UTF8):
+        candidates = [header_charset, "utf-8-sig"]
+    elif head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates = [header_charset, "utf-16"]
+    else:
+        m = META_CHARSET_RE.search(head[:CHARSET_SNIFF_BYTES])
+        candidates = [header_charset, m.group(1).decode("ascii") if m else None]
+    for name in candidates:
+        if not name:
+            continue
+        try:
+            encoding = codecs.lookup(name).name
+        except LookupError:
+            continue
+        # euc-kr로 표시된 페이지도 실제로는 cp949 확장 글자를 쓰는 경우가 많다
+        return "cp949" if encoding == "euc_kr" else encoding
+    return "utf-8"
+
+
+class SourceAdapter(ABC):
+    """게시판별 목록/상세 파서. 상태가 없어서 여러 소스가 함께 써도 된다.
+
+    하위 클래스는 parse_posts를 구현해야 한다 (빠뜨리면 소스 설정을 읽을 때 생성 단계에서 실패한다).
+
+    상세 파서 기본 구현은 표 형식 필드와 XE 계열 본문(.xe_content 등)을 기준으로 한다.
+    문서는 parser_backend로 한 번만 파싱하고, 같은 soup을 모든 추출기가 함께 쓴다.
+    상세 필드는 detail_extractor가 single_pass이면 soup 없이 DealFieldExtractor로 한 번에 뽑는다.
+    """
+
+    parser_backend = HTML_PARSER_BACKENDS[0]
+    detail_extractor = DETAIL_EXTRACTORS[0]
+
+    ORIGIN_LINK_SELECTORS = (
+        "a.product-link[href]",
+        "a.btn-info[href]",
+        "a.btn-primary[href]",
+        "article a[href]",
+        ".content a[href]",
+        ".xe_content a[href]",
+        ".rd_body a[href]",
+        ".board_read a[href]",
+        "a[href]",
+    )
+    FIELD_ALIASES = {
+        "price": ("가격", "판매가", "금액"),
+        "shipping": ("배송", "배송비", "배송/직배", "직배"),
+        "seller": ("판매처", "쇼핑몰", "몰", "스토어"),
+        "origin_link": ("링크", "구매링크", "원문링크", "url"),
+    }
+    ROW_KEY_SELECTOR = "th, dt, strong, .tit, .label"
+    ROW_VALUE_SELECTOR = "td, dd, .value, .txt"
+    CONTENT_SELECTORS = (".xe_content", ".rd_body", ".board_read", ".deal-content", ".product-body")
+
+    @classmethod
+    def from_options(cls, name: str, options: dict) -> "SourceAdapter":
+        if options:
+            raise ValueError(f"[{name}] 알 수 없는 소스 옵션: {sorted(options)}")
+        return cls()
+
+    @abstractmethod
+    def parse_posts(self, html: str, base_url: str, min_post_id: Optional[int] = None) -> List[dict]:
+        """목록 HTML에서 {"post_id", "title", "link"} 목록을 뽑는다 (min_post_id 이하는 _collect_posts로 거른다)."""
+
+    def listing_fragment(self, html: str) -> str:
+        # 목록 변경 여부 해시에 쓸 부분
+        return html
+
+    @staticmethod
+    def post_sequence(post_id: str) -> Optional[int]:
+        tail = post_id.rsplit(":", 1)[-1]
+        return int(tail) if tail.isdigit() else None
+
+    def high_water_sequence(self, post: dict, base_host: str) -> Optional[int]:
+        # 최고 ID는 소스 자체 글 링크에서만 올린다. 광고/외부 링크의 ?id= 같은 값이 섞이면
+        # 엉뚱하게 큰 값이 저장되어 다음 주기부터 모든 글을 건너뛰게 된다
+        if self.is_external_link(post["link"], base_host):
+            return None
+        return self.post_sequence(post["post_id"])
+
+    def _collect_posts(self, entries: Iterable[tuple[str, str, str]], min_post_id: Optional[int]) -> List[dict]:
+        # min_post_id가 주어지면 그 이하 ID는 건너뛰고, 연속으로 HWM_STOP_STREAK개를 만나면 순회를 멈춘다
+        posts = []
+        seen_ids: set[str] = set()
+        old_streak = 0
+        for post_id, title, link in entries:
+            sequence = self.post_sequence(post_id)
+            if min_post_id is not None and sequence is not None and sequence <= min_post_id:
+                old_streak += 1
+                if old_streak >= HWM_STOP_STREAK:
+                    break
+                continue
+            old_streak = 0
+
+            if post_id in seen_ids:
+                continue
+            seen_ids.add(post_id)
+
+            posts.append({"post_id": post_id, "title": title, "link": link})
+        return posts
+
+    @staticmethod
+    def clean_text(value: str) -> str:
+        return re.sub(r"\s+", " ", value).strip()
+
+    @staticmethod
+    def is_external_link(url: str, base_host: str) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme not in {"http", "https"}:
+            return False
+        if not parsed.netloc:
+            return False
+        if parsed.netloc.lower().endswith(base_host):
+            return False
+        return True
+
+    def make_soup(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, self.parser_backend)
+
+    def parse_origin_link(self, html: str, page_url: str, base_host: str) -> Optional[str]:
+        return self.origin_link_from_soup(self.make_soup(html), page_url, base_host)
+
+    def origin_link_from_soup(self, soup: BeautifulSoup, page_url: str, base_host: str) -> Optional[str]:
+        for selector in self.ORIGIN_LINK_SELECTORS:
+            for tag in soup.select(selector):
+                href = (tag.get("href") or "").strip()
+                if not href:
+                    continue
+                abs_url = urljoin(page_url, href)
+                if self.is_external_link(abs_url, base_host):
+                    return abs_url
+        return None
+
+    def extractor_spec(self) -> Optional[DealExtractorSpec]:
+        # 선택자는 어댑터를 만든 뒤 바뀌지 않으므로 한 번만 푼다
+        if "_extractor_spec" not in self.__dict__:
+            self._extractor_spec = compile_extractor_spec(self)
+        return self._extractor_spec
+
+    def parse_deal_fields(self, html: str, page_url: str, base_host: str) -> dict:
+        spec = self.extractor_spec() if self.detail_extractor == "single_pass" else None
+        if spec is not None:
+            return scan_html(html, DealFieldExtractor(spec, page_url, base_host))
+        return self.deal_fields_from_soup(self.make_soup(html), page_url, base_host)
+
+    def deal_fields_from_soup(self, soup: BeautifulSoup, page_url: str, base_host: str) -> dict:
+        result = {
+            "origin_link": self.origin_link_from_soup(soup, page_url, base_host),
+            "price": None,
+            "shipping": None,
+            "seller": None,
+            "content": None,
+        }
+
+        for row in soup.select("tr"):
+            key_cell = row.select_one(self.ROW_KEY_SELECTOR)
+            val_cell = row.select_one(self.ROW_VALUE_SELECTOR)
+            if not key_cell or not val_cell:
+                continue
+
+            key_text = self.clean_text(key_cell.get_text(" ", strip=True)).lower()
+            value_text = self.clean_text(val_cell.get_text(" ", strip=True))
+            if not value_text:
+                continue
+
+            for field_name, label_candidates in self.FIELD_ALIASES.items():
+                if result.get(field_name):
+                    continue
+                if any(label.lower() in key_text for label in label_candidates):
+                    result[field_name] = value_text
+                    if field_name == "origin_link":
+                        a_tag = val_cell.select_one("a[href]")
+                        if a_tag:
+                            abs_url = urljoin(page_url, (a_tag.get("href") or "").strip())
+                            if self.is_external_link(abs_url, base_host):
+                                result["origin_link"] = abs_url
+
+        for selector in self.CONTENT_SELECTORS:
+            section = soup.select_one(selector)
+            if section:
+                snippet = self.clean_text(section.get_text(" ", strip=True))
+                if snippet:
+                    result["content"] = snippet[:220]
+                    break
+
+        return result
+
+
+class AlgumonAdapter(SourceAdapter):
+    DEAL_PATH_RE = re.compile(r"(?:^|/)deal/(\d+)$")
+
+    @staticmethod
+    def extract_post_id_from_link(link: str) -> Optional[str]:
+        parsed = urlparse(link)
+        path = parsed.path.strip("/")
+
+        # 정상 패턴: /m/deal/938848 또는 /deal/938848
+        m = AlgumonAdapter.DEAL_PATH_RE.search(path)
+        if m:
+            return m.group(1)
+
+        # 우회/리다이렉트 패턴에서 id 추출 시도 (?id=123...)
+        qs = parse_qs(parsed.query)
+        for key in ("id", "post_id", "deal_id"):
+            if key in qs and qs[key]:
+                val = str(qs[key][0]).strip()
+                if val.isdigit():
+                    return val
+
+        return None
+
+    def high_water_sequence(self, post: dict, base_host: str) -> Optional[int]:
+        # 우회 링크의 쿼리 파라미터 ID는 알구몬 글 번호라는 보장이 없다
+        if not self.DEAL_PATH_RE.search(urlparse(post["link"]).path.strip("/")):
+            return None
+        return super().high_water_sequence(post, base_host)
+
+    def _iter_entries(self, soup: BeautifulSoup, base_url: str) -> Iterable[tuple[str, str, str]]:
+        for li in soup.select(".post-list li"):
+            title_tag = li.select_one(".product-body .item-name")
+            link_tag = li.select_one(".product-body a[href]")
+            if not title_tag or not link_tag:
+                continue
+
+            title = title_tag.get_text(strip=True)
+            href = link_tag.get("href", "").strip()
+            if not href:
+                continue
+
+            link = urljoin(base_url, href)
+            post_id = self.extract_post_id_from_link(link)
+
+            # 검색 페이지(/search/...), 게시판 목록, 외부 링크 등 비-딜 URL 제거
+            if not post_id:
+                continue
+            yield post_id, title, link
+
+    def parse_posts(self, html: str, base_url: str, min_post_id: Optional[int] = None) -> List[dict]:
+        soup = self.make_soup(html)
+        return self._collect_posts(self._iter_entries(soup, base_url), min_post_id)
+
+    def listing_fragment(self, html: str) -> str:
+        # 광고/시간 등 목록 밖의 변동을 무시하도록 .post-list 요소 부분만 잘라낸다 (파싱 없이)
+        start = POST_LIST_START_RE.search(html)
+        if not start:
+            return html
+        tag_re = re.compile(rf"<(/?){start.group(1)}\b[^>]*>", re.IGNORECASE)
+        depth = 0
+        for tag in tag_re.finditer(html, start.start()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                return html[start.start() : tag.end()]
+        return html[start.start() :]
+
+
+class SelectorAdapter(SourceAdapter):
+    """CSS 선택자만으로 정의하는 일반 게시판 목록 어댑터 (sources.json의 adapter: selector).
+
+    post_id는 다른 소스와 겹치지 않게 "소스이름:번호" 형태로 저장한다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        item_selector: str,
+        title_selector: str,
+        link_selector: str,
+        post_id_pattern: str,
+        fragment_selector: Optional[str] = None,
+        content_selectors: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.item_selector = item_selector
+        self.title_selector = title_selector
+        self.link_selector = link_selector
+        self.post_id_re = re.compile(post_id_pattern)
+        self.fragment_selector = fragment_selector
+        if content_selectors:
+            self.CONTENT_SELECTORS = tuple(content_selectors)
+
+    @classmethod
+    def from_options(cls, name: str, options: dict) -> "SourceAdapter":
+        try:
+            return cls(name, **options)
+        except TypeError as exc:
+            raise ValueError(f"[{name}] selector 소스 옵션 오류: {exc}") from exc
+
+    def listing_fragment(self, html: str) -> str:
+        # fragment_selector 요소(없으면 목록 항목들)만 해시해서 광고/시각/조회수 변동을 무시한다
+        soup = self.make_soup(html)
+        if self.fragment_selector:
+            fragment = soup.select_one(self.fragment_selector)
+            return str(fragment) if fragment is not None else html
+        items = soup.select(self.item_selector)
+        return "".join(str(item) for item in items) if items else html
+
+    def _iter_entries(self, soup: BeautifulSoup, base_url: str) -> Iterable[tuple[str, str, str]]:
+        for item in soup.select(self.item_selector):
+            title_tag = item.select_one(self.title_selector)
+            link_tag = item.select_one(self.link_selector)
+            if not title_tag or not link_tag:
+                continue
+            title = title_tag.get_text(strip=True)
+            href = (link_tag.get("href") or "").strip()
+            if not title or not href:
+                continue
+            link = urljoin(base_url, href)
+            m = self.post_id_re.search(link)
+            if not m:
+                continue
+            yield f"{self.name}:{m.group(1)}", title, link
+
+    def parse_posts(self, html: str, base_url: str, min_post_id: Optional[int] = None) -> List[dict]:
+        soup = self.make_soup(html)
+        return self._collect_posts(self._iter_entries(soup, base_url), min_post_id)
+
+
+SOURCE_ADAPTERS: dict[str, type[SourceAdapter]] = {
+    "algumon": AlgumonAdapter,
+    "selector": SelectorAdapter,
+}
+
+
+@dataclass
+class DealSource:
+    name: str
+    base_url: str
+    adapter: SourceAdapter
+    label: str
+    interval_sec: int
+    timeout_sec: int
+    concurrency: int
+    # 실행 중 상태 (fetch_state 테이블에서 지연 로드)
+    listing_validators: Optional[dict] = field(default=None, repr=False)
+    high_water: Optional[int] = field(default=None, repr=False)
+    scheduler: Optional[AdaptivePollScheduler] = field(default=None, repr=False)
+
+    @property
+    def base_host(self) -> str:
+        return urlparse(self.base_url).netloc.lower()
 
+    @property
+    def listing_state_key(self) -> str:
+        return f"listing:{self.base_url}"
 
-class SeenPostRepository:
-    def __init__(self, db_path: str):
-        self.db_path = db_path
-        self._init_db()
+    @property
+    def high_water_state_key(self) -> str:
+        return f"hwm:{self.base_url}"
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+    @property
+    def rates_state_key(self) -> str:
+        return f"rates:{self.base_url}"
 
-    def _init_db(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS seen_posts (
-                    post_id TEXT PRIMARY KEY,
-                    title TEXT,
-                    link TEXT,
-                    seen_at INTEGER
-                )
-                """
-            )
-            conn.commit()
 
-    def has(self, post_id: str) -> bool:
-        with self._connect() as conn:
-            row = conn.execute("SELECT 1 FROM seen_posts WHERE post_id = ?", (post_id,)).fetchone()
-            return row is not None
+def load_sources(config: BotConfig) -> List[DealSource]:
+    # 기본 소스(알구몬)는 항상 첫 번째. sources.json이 있으면 추가 소스를 읽는다
+    sources = [
+        DealSource(
+            name="algumon",
+            base_url=config.base_url,
+            adapter=AlgumonAdapter(),
+            label="알구몬",
+            interval_sec=config.check_interval_sec,
+            timeout_sec=config.request_timeout_sec,
+            concurrency=config.detail_concurrency,
+        )
+    ]
+    if not config.sources_file or not os.path.exists(config.sources_file):
+        configure_parser_backend(sources, config.html_parser, config.detail_extractor)
+        return sources
 
-    def add(self, post_id: str, title: str, link: str) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO seen_posts (post_id, title, link, seen_at) VALUES (?, ?, ?, ?)",
-                (post_id, title, link, int(time.time())),
-            )
-            conn.commit()
+    with open(config.sources_file, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    for entry in payload.get("sources", []):
+        options = dict(entry)
+        name = str(options.pop("name", "")).strip()
+        if not name or any(source.name == name for source in sources):
+            raise ValueError(f"소스 이름이 비었거나 중복입니다: {name!r}")
+        adapter_cls = SOURCE_ADAPTERS.get(options.pop("adapter", "selector"))
+        if adapter_cls is None:
+            raise ValueError(f"[{name}] 지원하지 않는 adapter입니다. ({', '.join(SOURCE_ADAPTERS)})")
+        source = DealSource(
+            name=name,
+            base_url=options.pop("base_url"),
+            label=options.pop("label", name),
+            interval_sec=int(options.pop("interval_sec", config.check_interval_sec)),
+            timeout_sec=int(options.pop("timeout_sec", config.request_timeout_sec)),
+            concurrency=int(options.pop("concurrency", config.detail_concurrency)),
+            adapter=adapter_cls.from_options(name, options),
+        )
+        if source.interval_sec < 5:
+            raise ValueError(f"[{name}] interval_sec는 5초 이상으로 설정하세요.")
+        if not 1 <= source.concurrency <= CONNECTOR_LIMIT:
+            raise ValueError(f"[{name}] concurrency는 1~{CONNECTOR_LIMIT} 사이로 설정하세요.")
+        sources.append(source)
+    configure_parser_backend(sources, config.html_parser, config.detail_extractor)
+    return sources
 
 
-class KeywordManager:
-    def __init__(self, keyword_file: str, default_keywords: Iterable[str] | None = None):
-        self.keyword_file = keyword_file
+def configure_parser_backend(sources: List[DealSource], name: str, detail_extractor: str) -> None:
+    backend = resolve_parser_backend(name)
+    for source in sources:
+        source.adapter.parser_backend = backend
+        source.adapter.detail_extractor = detail_extractor
+
+
+class SubscriberRegistry:
+    """여러 채팅방의 구독 설정과 키워드 -> 구독자 역색인.
+
+    딜 하나를 전체 키워드 오토마톤에 한 번만 통과시키고, 걸린 키워드의 구독자만 모은다.
+    변경 시 색인을 새로 만들어 통째로 교체하므로 조회 쪽은 잠금이 필요 없다.
+    """
+
+    MODES = ALERT_MODES
+
+    def __init__(self, repo: SeenPostRepository):
+        self.repo = repo
         self._lock = threading.Lock()
-        self._keywords = set(default_keywords or set())
-        self._load()
+        self._modes: dict[str, str] = {}
+        self._keywords: dict[str, set[str]] = {}
+        subscribers, keywords = repo.load_subscribers()
+        for chat_id, mode in subscribers:
+            self._modes[chat_id] = mode if mode in self.MODES else "keyword"
+        for chat_id, keyword in keywords:
+            if chat_id in self._modes:
+                self._keywords.setdefault(chat_id, set()).add(keyword)
+        self._rebuild()
 
-    def _load(self) -> None:
-        if not os.path.exists(self.keyword_file):
-            self._save()
-            return
-        try:
-            with open(self.keyword_file, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-            loaded = payload.get("keywords", [])
-            if isinstance(loaded, list):
-                loaded_set = {str(item).strip() for item in loaded if str(item).strip()}
-                # 과거 기본 키워드가 파일에 남아있어도 자동 제거
-                self._keywords = loaded_set - LEGACY_DEFAULT_KEYWORDS
-                if loaded_set != self._keywords:
-                    self._save()
-        except Exception as exc:
-            logging.warning("키워드 파일 로드 실패: %s", exc)
+    def _rebuild(self) -> None:
+        index: dict[str, set[str]] = {}
+        for chat_id, keywords in self._keywords.items():
+            for keyword in keywords:
+                index.setdefault(keyword.lower(), set()).add(chat_id)
+        self._index = {keyword: frozenset(chats) for keyword, chats in index.items()}
+        self._matcher = KeywordMatcher(self._index)
+        self._all_mode = frozenset(chat_id for chat_id, mode in self._modes.items() if mode == "all")
 
-    def _save(self) -> None:
-        with open(self.keyword_file, "w", encoding="utf-8") as f:
-            json.dump({"keywords": sorted(self._keywords)}, f, ensure_ascii=False, indent=2)
+    def __len__(self) -> int:
+        return len(self._modes)
 
-    def list_keywords(self) -> List[str]:
+    @property
+    def all_mode_chats(self) -> frozenset[str]:
+        return self._all_mode
+
+    def subscribe(self, chat_id: str, mode: str = "keyword") -> bool:
+        chat_id = chat_id.strip()
+        if not chat_id or mode not in self.MODES:
+            return False
         with self._lock:
-            return sorted(self._keywords)
+            self.repo.save_subscriber(chat_id, mode)
+            self._modes[chat_id] = mode
+            self._rebuild()
+        return True
 
-    def add(self, keyword: str) -> bool:
+    def unsubscribe(self, chat_id: str) -> bool:
+        with self._lock:
+            if chat_id not in self._modes:
+                return False
+            self.repo.save_subscriber(chat_id, None)
+            del self._modes[chat_id]
+            self._keywords.pop(chat_id, None)
+            self._rebuild()
+        return True
+
+    def add_keyword(self, chat_id: str, keyword: str) -> bool:
         keyword = keyword.strip()
-        if not keyword:
-            return False
         with self._lock:
-            before = len(self._keywords)
-            self._keywords.add(keyword)
-            changed = len(self._keywords) > before
-            if changed:
-                self._save()
-            return changed
+            if chat_id not in self._modes or not keyword or keyword in self._keywords.get(chat_id, set()):
+                return False
+            self.repo.save_subscriber_keyword(chat_id, keyword, True)
+            self._keywords.setdefault(chat_id, set()).add(keyword)
+            self._rebuild()
+        return True
 
-    def remove(self, keyword: str) -> bool:
+    def remove_keyword(self, chat_id: str, keyword: str) -> bool:
         keyword = keyword.strip()
         with self._lock:
-            if keyword not in self._keywords:
+            if keyword not in self._keywords.get(chat_id, set()):
                 return False
-            self._keywords.remove(keyword)
-            self._save()
-            return True
+            self.repo.save_subscriber_keyword(chat_id, keyword, False)
+            self._keywords[chat_id].discard(keyword)
+            self._rebuild()
+        return True
 
-    def matched_keywords(self, text: str) -> List[str]:
-        text_lower = text.lower()
+    def describe(self) -> List[str]:
         with self._lock:
-            return [k for k in sorted(self._keywords) if k.lower() in text_lower]
+            return [
+                f"{chat_id} ({mode}) {sorted(self._keywords.get(chat_id, set()))}"
+                for chat_id, mode in sorted(self._modes.items())
+            ]
+
+    def match(self, haystack: str) -> dict[str, List[str]]:
+        # chat_id -> 걸린 키워드 목록 (키워드는 소문자로 정규화됨)
+        index = self._index
+        hits: dict[str, List[str]] = {}
+        for keyword in self._matcher.search(haystack):
+            for chat_id in index[keyword]:
+                hits.setdefault(chat_id, []).append(keyword)
+        return hits
 
 
 class HotdealBot:
     def __init__(self, config: BotConfig):
         self.config = config
-        self.repo = SeenPostRepository(config.db_path)
+        self.repo = SeenPostRepository(
+            config.db_path,
+            cache_size=config.seen_cache_size,
+            bloom_capacity=config.seen_bloom_capacity,
+        )
         self.keywords = KeywordManager(config.keyword_file)
+        self.rules = RuleManager(config.rule_file)
+        self.subscribers = SubscriberRegistry(self.repo)
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        if config.near_dup_mode != "off":
+            self.near_duplicates = self._load_near_duplicates()
+        self.origin_resolver = OriginResolver(config.request_timeout_sec, config.resolve_short_links)
+        self.detail_cache = DealDetailCache(
+            config.detail_cache_size,
+            config.detail_cache_ttl_sec,
+            self.repo if config.detail_cache_persist else None,
+        )
         self.stop_event = threading.Event()
-        self.bot = telegram.Bot(token=config.telegram_token) if not config.dry_run else None
-        self.base_host = urlparse(config.base_url).netloc.lower()
+        self.parse_pool = ParsePool(config.parse_executor, config.parse_workers, config.parse_queue_size)
+        self.bot = (
+            telegram.Bot(token=config.telegram_token, base_url=config.telegram_api_base_url)
+            if not config.dry_run
+            else None
+        )
+        self.outbox = OutboxDispatcher(
+            self.repo,
+            self.send_message_to,
+            workers=config.outbox_workers,
+            global_rate=config.telegram_global_rate,
+            chat_rate=config.telegram_chat_rate,
+            max_attempts=config.outbox_max_attempts,
+        )
+        self.sources = load_sources(config)
+        self.default_source = self.sources[0]
+        self.base_host = self.default_source.base_host
+        for source in self.sources:
+            source.scheduler = AdaptivePollScheduler(
+                config.adaptive_polling,
+                config.min_interval_sec,
+                config.max_interval_sec,
+                config.poll_jitter,
+            )
+            source.scheduler.load(self.repo.get_state(source.rates_state_key))
         self._interval_lock = threading.Lock()
+        self.profiler = CycleProfiler()
+        METRICS.on_collect(self._collect_cache_metrics)
+
+    def _collect_cache_metrics(self) -> None:
+        # 캐시들은 자체적으로 적중/미스를 세고 있으므로 수집 시점에 값만 옮긴다
+        seen = self.repo.cache.stats()
+        CACHE_LOOKUPS_TOTAL.set_total(seen["hits"], "seen", "hit")
+        CACHE_LOOKUPS_TOTAL.set_total(seen["bloom_negatives"], "seen", "bloom_negative")
+        CACHE_LOOKUPS_TOTAL.set_total(seen["db_lookups"], "seen", "db_lookup")
+        detail = self.detail_cache.stats()
+        CACHE_LOOKUPS_TOTAL.set_total(detail["hits"], "detail", "hit")
+        CACHE_LOOKUPS_TOTAL.set_total(detail["db_hits"], "detail", "db_hit")
+        CACHE_LOOKUPS_TOTAL.set_total(detail["misses"], "detail", "miss")
+        origin = self.origin_resolver.stats()
+        CACHE_LOOKUPS_TOTAL.set_total(origin["cache_hits"], "short_link", "hit")
+        CACHE_LOOKUPS_TOTAL.set_total(origin["resolved"] + origin["failures"], "short_link", "miss")
+
+    async def start_metrics_server(self) -> Optional[web.AppRunner]:
+        if not self.config.metrics_port:
+            return None
+
+        async def handle_metrics(_: web.Request) -> web.Response:
+            # Prometheus 텍스트 노출 형식 0.0.4
+            return web.Response(text=METRICS.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.config.metrics_host, self.config.metrics_port).start()
+        logging.info("메트릭 엔드포인트: http://%s:%d/metrics", self.config.metrics_host, self.config.metrics_port)
+        return runner
+
+    def _load_near_duplicates(self) -> NearDuplicateIndex:
+        window_sec = self.config.near_dup_window_hours * 3600
+        index = NearDuplicateIndex(self.config.near_dup_threshold, window_sec)
+        # 재시작 후에도 최근 글과 비교할 수 있도록 본문은 상세 캐시에서 가져온다
+        for post_id, title, seen_at, payload in self.repo.recent_posts_with_content(int(time.time()) - window_sec):
+            content = json.loads(payload).get("content") if payload else None
+            index.add(post_id, title, content, now=seen_at)
+        return index
 
     def get_interval_sec(self) -> int:
         with self._interval_lock:
             return self.config.check_interval_sec
 
+    def get_mode(self) -> str:
+        with self._interval_lock:
+            return self.config.mode
+
+    def set_mode(self, value: str) -> bool:
+        mode = value.strip().lower()
+        if mode not in ALERT_MODES:
+            return False
+        with self._interval_lock:
+            self.config.mode = mode
+        logging.info("모드 변경됨: %s", mode)
+        return True
+
     def set_interval_sec(self, value: str) -> bool:
         try:
             sec = int(value.strip())
@@ -161,15 +3395,27 @@ class HotdealBot:
             return False
         with self._interval_lock:
             self.config.check_interval_sec = sec
+            self.default_source.interval_sec = sec
         return True
 
     def print_console_help(self) -> None:
         print("\n" + "=" * 62)
         print("📢 [명령어 가이드]")
         print(" - sec 숫자                 (예: sec 20) -> 체크 주기(초)")
+        print(" - mode [all|keyword]       -> 알림 모드 확인/변경")
         print(" - keyword add 키워드       (예: keyword add 치킨)")
         print(" - keyword del 키워드       (예: keyword del 치킨)")
         print(" - keyword list")
+        print(" - rule add 이름 식          (예: rule add 모니터 모니터 -중고 price<30만)")
+        print(" - rule del 이름 / rule list / rule test 제목")
+        print(" - sub add CHAT_ID [all|keyword]  /  sub del CHAT_ID")
+        print(" - sub kw add|del CHAT_ID 키워드  /  sub list")
+        print(" - price 글번호|URL|제목     -> 상품 가격 이력")
+        print(" - cache                    -> 본 글/상세 캐시 적중/미스 통계")
+        print(" - sched                    -> 소스별 폴링 간격/도착률")
+        print(" - hwm [reset 소스|all]      -> 소스별 최고 글 번호 확인/초기화")
+        print(" - profile cpu|mem N [파일]  -> 다음 N주기 cProfile/tracemalloc 저장")
+        print(" - profile stop / profile   -> 측정 중지 / 상태")
         print(" - exit")
         print("=" * 62 + "\n")
 
@@ -189,6 +3435,13 @@ class HotdealBot:
                         print(f"✅ 체크 주기 변경: {self.get_interval_sec()}초")
                     else:
                         print("❌ sec 값 오류. 5 이상의 정수를 입력하세요.")
+                elif cmd == "mode":
+                    if not arg:
+                        print(f"📊 현재 모드: {self.get_mode()} (1단계 필터: {self.config.keyword_prefilter})")
+                    elif self.set_mode(arg):
+                        print(f"✅ 모드 변경: {self.get_mode()}")
+                    else:
+                        print("❌ 모드는 'all' 또는 'keyword'이어야 합니다.")
                 elif cmd == "keyword":
                     kparts = arg.split(maxsplit=1)
                     kcmd = kparts[0].lower() if kparts else ""
@@ -207,6 +3460,32 @@ class HotdealBot:
                         print("📋 키워드:", self.keywords.list_keywords())
                     else:
                         print("❌ keyword 명령: add/del/list 중 하나를 사용하세요.")
+                elif cmd == "rule":
+                    self.handle_rule_command(arg)
+                elif cmd == "sub":
+                    self.handle_subscriber_command(arg)
+                elif cmd == "sched":
+                    for source in self.sources:
+                        scheduler = source.scheduler
+                        assert scheduler is not None
+                        hour = time.localtime().tm_hour
+                        rate = scheduler.hourly_rates[hour]
+                        print(
+                            f"⏱️ [{source.name}] 기본 {source.interval_sec}초, "
+                            f"다음 약 {scheduler.next_interval(source.interval_sec):.0f}초, "
+                            f"백오프 x{scheduler.backoff:.0f}, "
+                            f"{hour}시 도착률 {rate * 3600 if rate is not None else 0:.1f}건/시"
+                        )
+                elif cmd == "price":
+                    self.handle_price_command(arg)
+                elif cmd == "hwm":
+                    self.handle_high_water_command(arg)
+                elif cmd == "cache":
+                    print("📊 본 글 캐시:", self.repo.cache.stats())
+                    print("📊 상세 캐시:", self.detail_cache.stats())
+                    print("📊 단축 링크 해석:", self.origin_resolver.stats())
+                elif cmd == "profile":
+                    self.handle_profile_command(arg)
                 elif cmd == "exit":
                     print("종료 요청을 받았습니다.")
                     self.stop_event.set()
@@ -218,177 +3497,328 @@ class HotdealBot:
             except Exception as exc:
                 print(f"명령어 에러: {exc}")
 
+    def handle_profile_command(self, arg: str) -> None:
+        pparts = arg.split()
+        if not pparts:
+            print("🔬", self.profiler.status())
+        elif pparts[0].lower() == "stop":
+            if self.profiler.stop():
+                print("⏹️ 프로파일링 중지 요청 (다음 주기가 끝나면 저장)")
+            else:
+                print("❌ 진행 중인 프로파일링이 없습니다.")
+        else:
+            try:
+                cycles = int(pparts[1]) if len(pparts) > 1 else 1
+                path = self.profiler.request(pparts[0].lower(), cycles, pparts[2] if len(pparts) > 2 else None)
+            except ValueError as exc:
+                print(f"❌ {exc}")
+                return
+            print(f"✅ 다음 {cycles}주기 {pparts[0].lower()} 프로파일링 -> {path}")
+
+    def handle_rule_command(self, arg: str) -> None:
+        rparts = arg.split(maxsplit=2)
+        rcmd = rparts[0].lower() if rparts else ""
+        if rcmd == "add" and len(rparts) == 3:
+            try:
+                changed = self.rules.add(rparts[1], rparts[2])
+            except RuleSyntaxError as exc:
+                print(f"❌ 규칙 문법 오류: {exc}")
+                return
+            print(f"✅ 규칙 추가: {rparts[1]} = {rparts[2]}" if changed else "⚠️ 같은 규칙이 이미 있습니다.")
+        elif rcmd == "del" and len(rparts) == 2:
+            if self.rules.remove(rparts[1]):
+                print(f"🗑️ 규칙 삭제: {rparts[1]}")
+            else:
+                print("❌ 삭제할 규칙이 없습니다.")
+        elif rcmd == "list":
+            print(f"📋 규칙 {len(self.rules.engine)}개")
+            for name, expression in self.rules.list_rules():
+                print(f"   {name}: {expression}")
+        elif rcmd == "test" and len(rparts) >= 2:
+            # 목록 제목만으로 평가한다 ("[판매처] 상품 (가격/배송)" 형식이면 숫자 조건도 판정된다)
+            title = arg.split(maxsplit=1)[1]
+            print("🧪 걸린 규칙:", self.rules.matched_rules(title, self.empty_deal()))
+        else:
+            print("❌ rule 명령: add/del/list/test 중 하나를 사용하세요.")
+
+    def handle_high_water_command(self, arg: str) -> None:
+        hparts = arg.split()
+        if not hparts:
+            for source in self.sources:
+                print(f"🔖 [{source.name}] 최고 글 번호: {self.repo.get_state(source.high_water_state_key) or '없음'}")
+        elif hparts[0].lower() == "reset" and len(hparts) == 2:
+            targets = [s for s in self.sources if hparts[1] in ("all", s.name)]
+            if not targets:
+                print(f"❌ 알 수 없는 소스: {hparts[1]}")
+                return
+            for source in targets:
+                # 다음 주기는 목록 전체를 보고, 본 글 기록으로 재알림을 막은 뒤 최고 ID를 다시 저장한다
+                self.repo.delete_state(source.high_water_state_key)
+                source.high_water = None
+                print(f"🔄 [{source.name}] 최고 글 번호 초기화")
+        else:
+            print("❌ hwm 명령: hwm 또는 hwm reset 소스|all")
+
+    def handle_price_command(self, arg: str) -> None:
+        arg = arg.strip()
+        if not arg:
+            print("❌ price 명령: price 글번호|URL|제목")
+            return
+        if arg.isdigit():
+            product_key = self.repo.price_key_for_post(arg)
+        elif arg.startswith(("http://", "https://")):
+            product_key = canonicalize_url(arg)
+        else:
+            product_key = self.price_product_key(arg, {})
+        rows = self.repo.price_history(product_key) if product_key else []
+        if not rows:
+            print("❌ 가격 이력이 없습니다.")
+            return
+        since = int(time.time()) - self.config.price_lowest_days * 86400
+        recent = [price for observed_at, price, _ in rows if observed_at >= since]
+        print(f"💰 {product_key} (최근 {len(rows)}건)")
+        if recent:
+            print(f"   {self.config.price_lowest_days}일 최저가: {min(recent):,}원")
+        for observed_at, price, post_id in rows:
+            print(f"   {time.strftime('%Y-%m-%d %H:%M', time.localtime(observed_at))}  {price:>10,}원  #{post_id}")
+
+    def handle_subscriber_command(self, arg: str) -> None:
+        sparts = arg.split()
+        scmd = sparts[0].lower() if sparts else ""
+        if scmd == "add" and len(sparts) in (2, 3):
+            mode = sparts[2].lower() if len(sparts) == 3 else "keyword"
+            if self.subscribers.subscribe(sparts[1], mode):
+                print(f"✅ 구독자 등록: {sparts[1]} ({mode})")
+            else:
+                print("❌ 구독자 등록 실패. 모드는 all 또는 keyword 입니다.")
+        elif scmd == "del" and len(sparts) == 2:
+            if self.subscribers.unsubscribe(sparts[1]):
+                print(f"🗑️ 구독자 삭제: {sparts[1]}")
+            else:
+                print("❌ 등록되지 않은 구독자입니다.")
+        elif scmd == "kw" and len(sparts) >= 4 and sparts[1].lower() in ("add", "del"):
+            chat_id = sparts[2]
+            keyword = arg.split(maxsplit=3)[3]
+            if sparts[1].lower() == "add":
+                ok = self.subscribers.add_keyword(chat_id, keyword)
+                print(f"✅ {chat_id} 키워드 추가: {keyword}" if ok else "⚠️ 키워드 추가 실패(미등록 구독자/빈 값/중복)")
+            else:
+                ok = self.subscribers.remove_keyword(chat_id, keyword)
+                print(f"🗑️ {chat_id} 키워드 삭제: {keyword}" if ok else "❌ 삭제할 키워드가 없습니다.")
+        elif scmd == "list":
+            print(f"👥 구독자 {len(self.subscribers)}명")
+            for line in self.subscribers.describe():
+                print("  ", line)
+        else:
+            print("❌ sub 명령: add/del/kw/list 중 하나를 사용하세요.")
+
     async def send_message(self, text: str) -> None:
+        await self.send_message_to(self.config.chat_id, text)
+
+    async def send_message_to(self, chat_id: str, text: str) -> None:
         if self.config.dry_run:
-            logging.info("[DRY_RUN] 메시지 전송 스킵: %s", text.replace("\n", " | "))
+            logging.info("[DRY_RUN] 메시지 전송 스킵 (%s): %s", chat_id, text.replace("\n", " | "))
             return
         assert self.bot is not None
-        await self.bot.send_message(chat_id=self.config.chat_id, text=text, disable_web_page_preview=False)
-
-    async def fetch_html(self, session: aiohttp.ClientSession, url: str) -> str:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-            )
-        }
-        async with session.get(url, headers=headers, timeout=self.config.request_timeout_sec) as resp:
-            if resp.status != 200:
-                raise RuntimeError(f"접속 실패: HTTP {resp.status} ({url})")
-            return await resp.text()
+        with SEND_MESSAGE_SECONDS.time():
+            await self.bot.send_message(chat_id=chat_id, text=text, disable_web_page_preview=False)
 
+    async def fetch_html(
+        self, session: aiohttp.ClientSession, url: str, timeout_sec: Optional[int] = None, kind: str = "detail"
+    ) -> str:
+        timeout = timeout_sec or self.config.request_timeout_sec
+        try:
+            async with session.get(url, headers=REQUEST_HEADERS, timeout=timeout) as resp:
+                HTTP_RESPONSES_TOTAL.inc(kind, str(resp.status))
+                if resp.status != 200:
+                    raise HttpStatusError(resp.status, url, _parse_retry_after(resp.headers.get("Retry-After")))
+                return await resp.text()
+        except asyncio.TimeoutError:
+            HTTP_RESPONSES_TOTAL.inc(kind, "timeout")
+            raise
 
-    @staticmethod
-    def _extract_post_id_from_link(link: str) -> Optional[str]:
-        parsed = urlparse(link)
-        path = parsed.path.strip("/")
-
-        # 정상 패턴: /m/deal/938848 또는 /deal/938848
-        m = re.search(r"(?:^|/)deal/(\d+)$", path)
-        if m:
-            return m.group(1)
+    async def stream_deal_fields(
+        self, session: aiohttp.ClientSession, url: str, source: DealSource, spec: DealExtractorSpec
+    ) -> dict:
+        """상세 페이지를 조각으로 받으며 바로 추출기에 넣는다.
 
-        # 우회/리다이렉트 패턴에서 id 추출 시도 (?id=123...)
-        qs = parse_qs(parsed.query)
-        for key in ("id", "post_id", "deal_id"):
-            if key in qs and qs[key]:
-                val = str(qs[key][0]).strip()
-                if val.isdigit():
-                    return val
+        모든 필드가 확정되거나(extractor.done) detail_max_bytes를 넘으면 나머지 본문은 받지 않고 연결을 끊는다.
+        문자셋은 첫 CHARSET_SNIFF_BYTES 바이트로 한 번만 정한다.
+        """
+        extractor = DealFieldExtractor(spec, url, source.base_host)
+        scanner = HtmlEventScanner(extractor)
+        max_bytes = self.config.detail_max_bytes
+        decoder = None
+        head = b""
+        received = 0
+        parse_sec = 0.0
+        outcome = "complete"
+        try:
+            async with session.get(url, headers=REQUEST_HEADERS, timeout=source.timeout_sec) as resp:
+                HTTP_RESPONSES_TOTAL.inc("detail", str(resp.status))
+                if resp.status != 200:
+                    raise HttpStatusError(resp.status, url, _parse_retry_after(resp.headers.get("Retry-After")))
+                async for chunk in resp.content.iter_chunked(DETAIL_STREAM_CHUNK):
+                    received += len(chunk)
+                    if decoder is None:
+                        head += chunk
+                        if len(head) < CHARSET_SNIFF_BYTES:
+                            continue
+                        decoder = codecs.getincrementaldecoder(sniff_charset(resp.charset, head))()
+                        chunk, head = head, b""
+                    started = time.perf_counter()
+                    scanner.feed(decoder.decode(chunk))
+                    parse_sec += time.perf_counter() - started
+                    # done은 출처 링크가 최우선 규칙에서 확정된 경우뿐이다. 낮은 순위 링크만 찾은 상태에서
+                    # 끊으면 뒤에 나오는 상품 링크 대신 헤더/SNS 링크가 출처가 된다
+                    if extractor.done:
+                        outcome = "early"
+                        break
+                    if max_bytes and received >= max_bytes:
+                        outcome = "capped"
+                        break
+                else:
+                    if decoder is None:
+                        decoder = codecs.getincrementaldecoder(sniff_charset(resp.charset, head))()
+                    started = time.perf_counter()
+                    scanner.feed(decoder.decode(head, final=True))
+                    parse_sec += time.perf_counter() - started
+        except asyncio.TimeoutError:
+            HTTP_RESPONSES_TOTAL.inc("detail", "timeout")
+            raise
+        finally:
+            DETAIL_BYTES_TOTAL.inc(source.name, amount=received)
+        DETAIL_STREAM_TOTAL.inc(outcome)
 
-        return None
+        started = time.perf_counter()
+        deal = scanner.close()
+        PARSE_DEAL_FIELDS_SECONDS.observe(parse_sec + time.perf_counter() - started, source.name)
+        if outcome == "capped" and not extractor.done:
+            # 잘린 문서에서는 더 높은 순위의 출처 링크가 뒤에 있었을 수 있다. 상품 키로 쓰지 않게 표시한다
+            deal["truncated"] = True
+        return deal
 
-    @staticmethod
-    def parse_posts(html: str, base_url: str) -> List[dict]:
-        soup = BeautifulSoup(html, "html.parser")
-        posts = []
-        seen_ids: set[str] = set()
+    async def _load_listing_validators(self, source: DealSource) -> dict:
+        if source.listing_validators is None:
+            raw = await self.repo.get_state_async(source.listing_state_key)
+            source.listing_validators = json.loads(raw) if raw else {}
+        return source.listing_validators
 
-        for li in soup.select(".post-list li"):
-            title_tag = li.select_one(".product-body .item-name")
-            link_tag = li.select_one(".product-body a[href]")
-            if not title_tag or not link_tag:
-                continue
+    async def fetch_listing(self, session: aiohttp.ClientSession, source: DealSource) -> tuple[Optional[str], dict]:
+        """목록 페이지를 조건부 요청으로 가져온다.
 
-            title = title_tag.get_text(strip=True)
-            href = link_tag.get("href", "").strip()
-            if not href:
-                continue
+        변경이 없으면 (None, 기존 검증값)을, 바뀌었으면 (html, 새 검증값)을 돌려준다.
+        새 검증값은 처리가 끝난 뒤 commit_listing_validators로 저장해야 한다.
+        """
+        validators = await self._load_listing_validators(source)
+        url = source.base_url
+        headers = dict(REQUEST_HEADERS)
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
 
-            link = urljoin(base_url, href)
-            post_id = HotdealBot._extract_post_id_from_link(link)
+        try:
+            with stage_span("listing_fetch", LISTING_FETCH_SECONDS, (source.name,)):
+                async with session.get(url, headers=headers, timeout=source.timeout_sec) as resp:
+                    HTTP_RESPONSES_TOTAL.inc("listing", str(resp.status))
+                    if resp.status == 304:
+                        logging.debug("[%s] 목록 변경 없음 (304 Not Modified)", source.name)
+                        return None, validators
+                    if resp.status != 200:
+                        raise HttpStatusError(resp.status, url, _parse_retry_after(resp.headers.get("Retry-After")))
+                    html = await resp.text()
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+        except asyncio.TimeoutError:
+            HTTP_RESPONSES_TOTAL.inc("listing", "timeout")
+            raise
 
-            # 검색 페이지(/search/...), 게시판 목록, 외부 링크 등 비-딜 URL 제거
-            if not post_id:
-                continue
+        fragment = await self.parse_pool.run(source.adapter.listing_fragment, html)
+        fragment_hash = hashlib.sha1(fragment.encode("utf-8")).hexdigest()
+        new_validators = {"etag": etag, "last_modified": last_modified, "fragment_hash": fragment_hash}
+        if fragment_hash == validators.get("fragment_hash"):
+            logging.debug("[%s] 목록 내용 변경 없음 (해시 일치)", source.name)
+            if new_validators != validators:
+                await self.commit_listing_validators(source, new_validators)
+            return None, validators
+        return html, new_validators
 
-            if post_id in seen_ids:
-                continue
-            seen_ids.add(post_id)
+    async def commit_listing_validators(self, source: DealSource, validators: dict) -> None:
+        if validators == source.listing_validators:
+            return
+        await self.repo.set_state_async(source.listing_state_key, json.dumps(validators))
+        source.listing_validators = validators
 
-            posts.append({"post_id": post_id, "title": title, "link": link})
+    # 아래 파서들은 기본 소스(알구몬) 어댑터에 위임한다
+    _extract_post_id_from_link = staticmethod(AlgumonAdapter.extract_post_id_from_link)
+    _clean_text = staticmethod(SourceAdapter.clean_text)
 
-        return posts
+    @staticmethod
+    def parse_posts(html: str, base_url: str, min_post_id: Optional[int] = None) -> List[dict]:
+        return AlgumonAdapter().parse_posts(html, base_url, min_post_id)
 
     def _is_external_link(self, url: str) -> bool:
-        parsed = urlparse(url)
-        if parsed.scheme not in {"http", "https"}:
-            return False
-        if not parsed.netloc:
-            return False
-        if parsed.netloc.lower().endswith(self.base_host):
-            return False
-        return True
+        return SourceAdapter.is_external_link(url, self.base_host)
 
     def parse_origin_link(self, html: str, page_url: str) -> Optional[str]:
-        soup = BeautifulSoup(html, "html.parser")
-        selectors = [
-            "a.product-link[href]",
-            "a.btn-info[href]",
-            "a.btn-primary[href]",
-            "article a[href]",
-            ".content a[href]",
-            ".xe_content a[href]",
-            ".rd_body a[href]",
-            ".board_read a[href]",
-            "a[href]",
-        ]
-        for selector in selectors:
-            for tag in soup.select(selector):
-                href = (tag.get("href") or "").strip()
-                if not href:
-                    continue
-                abs_url = urljoin(page_url, href)
-                if self._is_external_link(abs_url):
-                    return abs_url
-        return None
-
-    @staticmethod
-    def _clean_text(value: str) -> str:
-        return re.sub(r"\s+", " ", value).strip()
+        return self.default_source.adapter.parse_origin_link(html, page_url, self.base_host)
 
     def parse_deal_fields(self, html: str, page_url: str) -> dict:
-        soup = BeautifulSoup(html, "html.parser")
-        result = {
-            "origin_link": self.parse_origin_link(html, page_url),
-            "price": None,
-            "shipping": None,
-            "seller": None,
-            "content": None,
-        }
-
-        aliases = {
-            "price": ("가격", "판매가", "금액"),
-            "shipping": ("배송", "배송비", "배송/직배", "직배"),
-            "seller": ("판매처", "쇼핑몰", "몰", "스토어"),
-            "origin_link": ("링크", "구매링크", "원문링크", "url"),
-        }
-
-        for row in soup.select("tr"):
-            key_cell = row.select_one("th, dt, strong, .tit, .label")
-            val_cell = row.select_one("td, dd, .value, .txt")
-            if not key_cell or not val_cell:
-                continue
-
-            key_text = self._clean_text(key_cell.get_text(" ", strip=True)).lower()
-            value_text = self._clean_text(val_cell.get_text(" ", strip=True))
-            if not value_text:
-                continue
-
-            for field_name, label_candidates in aliases.items():
-                if result.get(field_name):
-                    continue
-                if any(label.lower() in key_text for label in label_candidates):
-                    result[field_name] = value_text
-                    if field_name == "origin_link":
-                        a_tag = val_cell.select_one("a[href]")
-                        if a_tag:
-                            abs_url = urljoin(page_url, (a_tag.get("href") or "").strip())
-                            if self._is_external_link(abs_url):
-                                result["origin_link"] = abs_url
+        return self.default_source.adapter.parse_deal_fields(html, page_url, self.base_host)
 
-        for selector in [".xe_content", ".rd_body", ".board_read", ".deal-content", ".product-body"]:
-            section = soup.select_one(selector)
-            if section:
-                snippet = self._clean_text(section.get_text(" ", strip=True))
-                if snippet:
-                    result["content"] = snippet[:220]
-                    break
+    @staticmethod
+    def empty_deal() -> dict:
+        return {"origin_link": None, "price": None, "shipping": None, "seller": None, "content": None}
 
-        return result
+    def needs_detail(self, title: str) -> bool:
+        # 1단계: 목록에 있는 제목만으로 상세 페이지가 필요한지 정한다.
+        # all 모드 알림은 본문에 상세 정보를 쓰고, 필터가 꺼져 있으면 본문에서 키워드가 걸릴 수 있다
+        if self.get_mode() == "all" or self.subscribers.all_mode_chats or self.config.keyword_prefilter == "off":
+            return True
+        return bool(self.keywords.matched_keywords(title) or self.subscribers.match(title))
 
-    async def resolve_deal_fields(self, session: aiohttp.ClientSession, post_link: str) -> dict:
+    async def resolve_deal_fields(
+        self, session: aiohttp.ClientSession, post_link: str, source: Optional[DealSource] = None
+    ) -> dict:
         if not self.config.include_origin_link:
-            return {"origin_link": None, "price": None, "shipping": None, "seller": None, "content": None}
+            return self.empty_deal()
+        try:
+            cached = await self.detail_cache.get(post_link)
+        except Exception as exc:
+            logging.warning("상세 캐시 조회 실패 (%s): %s", post_link, exc)
+            cached = None
+        if cached is not None:
+            return cached
+        source = source or self.default_source
+        adapter = source.adapter
+        spec = None
+        if self.config.detail_streaming and adapter.detail_extractor == "single_pass":
+            spec = adapter.extractor_spec()
         try:
-            detail_html = await self.fetch_html(session, post_link)
-            return self.parse_deal_fields(detail_html, post_link)
+            if spec is not None:
+                # 스트리밍 추출은 조각마다 짧게 끝나므로 이벤트 루프에서 바로 돌린다
+                with stage_span("detail_fetch", DETAIL_FETCH_SECONDS, (source.name,)):
+                    deal = await self.stream_deal_fields(session, post_link, source, spec)
+            else:
+                with stage_span("detail_fetch", DETAIL_FETCH_SECONDS, (source.name,)):
+                    detail_html = await self.fetch_html(session, post_link, source.timeout_sec)
+                with stage_span("parse_deal_fields", PARSE_DEAL_FIELDS_SECONDS, (source.name,)):
+                    deal = await self.parse_pool.run(
+                        adapter.parse_deal_fields, detail_html, post_link, source.base_host
+                    )
         except Exception as exc:
             logging.debug("상세 정보 추출 실패 (%s): %s", post_link, exc)
-            return {"origin_link": None, "price": None, "shipping": None, "seller": None, "content": None}
+            return self.empty_deal()
+        # 실패한 결과는 캐시하지 않아서 다음에 다시 시도한다. 캐시 저장 실패는 알림을 막지 않는다
+        try:
+            await self.detail_cache.put(post_link, deal)
+        except Exception as exc:
+            logging.warning("상세 캐시 저장 실패 (%s): %s", post_link, exc)
+        return deal
 
-    def build_alert_message(self, title: str, algo_link: str, deal: dict) -> str:
-        # 고정 포맷: 핫딜발견 / 제목 / 내용 / 알구몬링크
+    def build_alert_message(self, title: str, algo_link: str, deal: dict, link_label: str = "알구몬") -> str:
+        # 고정 포맷: 핫딜발견 / 제목 / 내용 / (소스)링크
         lines = ["🚨 핫딜발견", f"제목: {title}"]
 
         content_parts = []
@@ -402,11 +3832,14 @@ class HotdealBot:
             content_parts.append(str(deal["content"]))
 
         lines.append(f"내용: {' | '.join(content_parts) if content_parts else '정보 없음'}")
-        lines.append(f"알구몬링크: {algo_link}")
+        if deal.get("price_note"):
+            lines.append(f"가격: {deal['price_note']}")
+        lines.append(f"{link_label}링크: {algo_link}")
         return "\n".join(lines)
 
-    def detect_keyword_hits(self, title: str, deal: dict) -> List[str]:
-        haystack = " ".join(
+    @staticmethod
+    def build_keyword_haystack(title: str, deal: dict) -> str:
+        return " ".join(
             [
                 title,
                 str(deal.get("seller") or ""),
@@ -416,67 +3849,326 @@ class HotdealBot:
                 str(deal.get("origin_link") or ""),
             ]
         )
-        return self.keywords.matched_keywords(haystack)
 
-    async def maybe_send_keyword_alert_burst(self, title: str, algo_link: str, deal: dict, matched_keywords: List[str]) -> None:
-        if not matched_keywords:
-            return
+    def detect_keyword_hits(self, title: str, deal: dict) -> List[str]:
+        return self.keywords.matched_keywords(self.build_keyword_haystack(title, deal)) + self.rule_labels(title, deal)
+
+    def rule_labels(self, title: str, deal: dict) -> List[str]:
+        # 규칙 이름은 키워드와 구분되게 [이름]으로 키워드 알림에 함께 싣는다
+        return [f"[{name}]" for name in self.rules.matched_rules(title, deal)]
+
+    def build_keyword_alert_message(
+        self, title: str, algo_link: str, deal: dict, matched_keywords: List[str], link_label: str = "알구몬"
+    ) -> str:
+        lines = [
+            "🚨 키워드 핫딜 발견 !",
+            f"키워드: {', '.join(matched_keywords)}",
+            f"제목: {title}",
+            f"내용: {self._clean_text(str(deal.get('content') or '정보 없음'))[:220]}",
+        ]
+        if deal.get("price_note"):
+            lines.append(f"가격: {deal['price_note']}")
+        lines.append(f"{link_label}링크: {algo_link}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def price_product_key(title: str, deal: dict) -> Optional[str]:
+        # 정규화 원문 URL이 있으면 그것을, 없으면(또는 잘린 문서면) 태그/가격을 지운 제목을 상품 키로 쓴다
+        if deal.get("canonical_url"):
+            return str(deal["canonical_url"])
+        if deal.get("origin_link") and not deal.get("truncated"):
+            return canonicalize_url(str(deal["origin_link"]))
+        normalized = NearDuplicateIndex.normalize(title)
+        return f"title:{normalized}" if normalized else None
+
+    @staticmethod
+    def deal_price(title: str, deal: dict) -> Optional[int]:
+        if deal.get("price"):
+            return parse_amount(str(deal["price"]))
+        return parse_amount(title_listing_fields(title)[1])
+
+    async def annotate_price(self, title: str, deal: dict) -> Optional[tuple[str, int]]:
+        """가격 이력과 비교해서 deal["price_note"]를 채우고, 기록할 (상품 키, 가격)을 돌려준다."""
+        product_key = self.price_product_key(title, deal)
+        price = self.deal_price(title, deal)
+        if product_key is None or price is None:
+            return None
+        since = int(time.time()) - self.config.price_lowest_days * 86400
+        with stage_span("price_lookup"):
+            lowest, last = await self.repo.price_stats_async(product_key, since)
+        notes = []
+        if lowest is not None and price < lowest:
+            notes.append(f"📉 {self.config.price_lowest_days}일 최저가 (이전 최저 {lowest:,}원)")
+        drop = self.config.price_drop_percent
+        if drop > 0 and last and price <= last * (1 - drop / 100):
+            notes.append(f"직전 {last:,}원 대비 {(last - price) / last * 100:.0f}% 하락")
+        if notes:
+            deal["price_note"] = ", ".join(notes)
+        return product_key, price
+
+    def build_outbox_messages(
+        self, post_id: str, title: str, algo_link: str, deal: dict, link_label: str = "알구몬"
+    ) -> List[tuple[str, str, str]]:
+        # (dedupe_key, chat_id, text). dedupe_key가 같으면 다시 적재되지 않는다
+        # 기본 채팅방과 구독자가 같은 방이면 dedupe_key가 겹쳐서 한 번만 적재된다.
+        chat_id = self.config.chat_id
+        alert_message = self.build_alert_message(title, algo_link, deal, link_label)
+        messages = []
+        if self.get_mode() == "all":
+            messages.append((f"{chat_id}:{post_id}:alert", chat_id, alert_message))
+        haystack = self.build_keyword_haystack(title, deal)
+        with stage_span("keyword_match", KEYWORD_MATCH_SECONDS):
+            matched_keywords = self.keywords.matched_keywords(haystack) + self.rule_labels(title, deal)
+            subscriber_hits = self.subscribers.match(haystack)
+        if matched_keywords:
+            keyword_message = self.build_keyword_alert_message(title, algo_link, deal, matched_keywords, link_label)
+            for n in range(KEYWORD_ALERT_REPEAT):
+                messages.append((f"{chat_id}:{post_id}:keyword:{n}", chat_id, keyword_message))
+
+        for sub_chat_id in self.subscribers.all_mode_chats:
+            messages.append((f"{sub_chat_id}:{post_id}:alert", sub_chat_id, alert_message))
+        for sub_chat_id, sub_keywords in subscriber_hits.items():
+            keyword_message = self.build_keyword_alert_message(
+                title, algo_link, deal, sorted(sub_keywords), link_label
+            )
+            messages.append((f"{sub_chat_id}:{post_id}:keyword:0", sub_chat_id, keyword_message))
+        return messages
 
-        keyword_message = "\n".join(
+    def build_duplicate_messages(
+        self, post_id: str, title: str, algo_link: str, previous_title: str, link_label: str = "알구몬"
+    ) -> List[tuple[str, str, str]]:
+        # 같은 상품/비슷한 글이 최근에 알림된 경우: 기본 채팅방에만 한 줄 요약으로 합쳐서 알린다
+        chat_id = self.config.chat_id
+        text = "\n".join(
             [
-                "🚨 키워드 핫딜 발견 !",
-                f"키워드: {', '.join(matched_keywords)}",
+                "🔁 동일 상품 재등록",
                 f"제목: {title}",
-                f"내용: {self._clean_text(str(deal.get('content') or '정보 없음'))[:220]}",
-                f"알구몬링크: {algo_link}",
+                f"이전 알림: {previous_title}",
+                f"{link_label}링크: {algo_link}",
             ]
         )
-        for _ in range(3):
-            await self.send_message(keyword_message)
+        return [(f"{chat_id}:{post_id}:duplicate", chat_id, text)]
 
-    async def check_once(self, session: aiohttp.ClientSession) -> int:
-        html = await self.fetch_html(session, self.config.base_url)
-        posts = self.parse_posts(html, self.config.base_url)
+    async def _load_high_water(self, source: DealSource) -> Optional[int]:
+        if source.high_water is None:
+            raw = await self.repo.get_state_async(source.high_water_state_key)
+            source.high_water = int(raw) if raw else None
+        return source.high_water
 
-        sent_count = 0
-        for post in posts:
-            post_id = post["post_id"]
-            title = post["title"]
-            algo_link = post["link"]
+    async def commit_high_water(self, source: DealSource, post_id: int) -> None:
+        current = await self._load_high_water(source)
+        if current is not None and post_id <= current:
+            return
+        await self.repo.set_state_async(source.high_water_state_key, str(post_id))
+        source.high_water = post_id
 
-            if self.repo.has(post_id):
-                continue
+    async def check_once(self, session: aiohttp.ClientSession) -> tuple[int, int]:
+        return await self.check_source(session, self.default_source)
+
+    async def check_source(self, session: aiohttp.ClientSession, source: DealSource) -> tuple[int, int]:
+        # (새 글 수, 알림을 적재한 글 수)
+        self.profiler.before_cycle()
+        token = _ACTIVE_TRACE.set(CycleTrace()) if self.config.slow_cycle_sec > 0 else None
+        try:
+            return await self._check_source(session, source)
+        finally:
+            self.profiler.after_cycle()
+            if token is not None:
+                trace = _ACTIVE_TRACE.get()
+                _ACTIVE_TRACE.reset(token)
+                assert trace is not None
+                elapsed = trace.elapsed()
+                if elapsed >= self.config.slow_cycle_sec:
+                    logging.warning("[%s] 느린 주기 %.2f초: %s", source.name, elapsed, trace.summary())
+
+    async def _check_source(self, session: aiohttp.ClientSession, source: DealSource) -> tuple[int, int]:
+        html, validators = await self.fetch_listing(session, source)
+        if html is None:
+            return 0, 0
+
+        min_post_id = None
+        if self.config.incremental_mode:
+            with stage_span("high_water"):
+                high_water = await self._load_high_water(source)
+            if high_water is not None:
+                min_post_id = high_water - self.config.hwm_safety_window
+        with stage_span("parse_posts", PARSE_POSTS_SECONDS, (source.name,)):
+            posts = await self.parse_pool.run(source.adapter.parse_posts, html, source.base_url, min_post_id)
+        POSTS_SEEN_TOTAL.inc(source.name, amount=len(posts))
+        counts = await self.process_posts(session, posts, source)
+
+        # 처리가 끝까지 성공한 뒤에만 검증값/최고 ID를 저장해야 실패한 목록을 다시 처리할 수 있다
+        with stage_span("commit_state"):
+            await self.commit_listing_validators(source, validators)
+            if self.config.incremental_mode:
+                sequences = [source.adapter.high_water_sequence(post, source.base_host) for post in posts]
+                sequences = [seq for seq in sequences if seq is not None]
+                if sequences:
+                    await self.commit_high_water(source, max(sequences))
+        return counts
+
+    async def process_posts(
+        self, session: aiohttp.ClientSession, posts: List[dict], source: Optional[DealSource] = None
+    ) -> tuple[int, int]:
+        # (새 글 수, 알림을 적재한 글 수). 폴링 간격 조정에는 새 글 수를 쓴다
+        source = source or self.default_source
+        with stage_span("seen_lookup"):
+            seen_ids = await self.repo.has_many_async(post["post_id"] for post in posts)
+        new_posts = [post for post in posts if post["post_id"] not in seen_ids]
+        if not new_posts:
+            return 0, 0
+        POSTS_NEW_TOTAL.inc(source.name, amount=len(new_posts))
+
+        # 상세 페이지는 제한된 동시성으로 한꺼번에 조회하고, 알림은 목록 순서대로 보낸다.
+        semaphore = asyncio.Semaphore(source.concurrency)
+
+        async def enrich(link: str) -> dict:
+            async with semaphore:
+                deal = await self.resolve_deal_fields(session, link, source)
+                if self.config.origin_dedup_mode != "off" and not deal.get("truncated"):
+                    deal["canonical_url"] = await self.origin_resolver.canonicalize(session, deal.get("origin_link"))
+                return deal
+
+        # 1단계에서 걸러진 글은 상세 페이지 없이 제목만으로 2단계(알림 생성)를 거친다
+        # 규칙은 가격/판매처 조건이 상세 정보로 뒤집힐 수 있어서, 제목만으로 거짓이 확정되지 않은 글은 조회한다
+        with stage_span("title_match"):
+            rule_hits = self.rules.engine.evaluate_batch((post["title"], None) for post in new_posts)
+            wanted = [bool(hits) or self.needs_detail(post["title"]) for post, hits in zip(new_posts, rule_hits)]
+        if not all(wanted):
+            DETAIL_SKIPPED_TOTAL.inc(source.name, amount=wanted.count(False))
+        tasks = [
+            asyncio.create_task(enrich(post["link"])) if fetch else None for post, fetch in zip(new_posts, wanted)
+        ]
+        alerted = 0
+        try:
+            for post, task in zip(new_posts, tasks):
+                post_id = post["post_id"]
+                title = post["title"]
+                algo_link = post["link"]
+
+                if task is None:
+                    deal = self.empty_deal()
+                else:
+                    with stage_span("detail_wait"):
+                        deal = await task
+                observed = await self.annotate_price(title, deal) if self.config.price_history else None
+                messages = self.build_outbox_messages(post_id, title, algo_link, deal, source.label)
+
+                # 알림이 나가는 글만 중복 검사/기록 대상이다 (keyword 모드에서 걸리지 않은 글은 제외)
+                canonical_url = deal.get("canonical_url") if messages else None
+                previous: Optional[tuple] = None
+                duplicate_mode = "off"
+                if canonical_url:
+                    since = int(time.time()) - self.config.origin_dedup_window_hours * 3600
+                    previous = await self.repo.find_recent_product_async(canonical_url, since)
+                    duplicate_mode = self.config.origin_dedup_mode
+                if messages and previous is None and self.near_duplicates is not None:
+                    previous = self.near_duplicates.query(title, deal.get("content"))
+                    duplicate_mode = self.config.near_dup_mode
 
-            deal = await self.resolve_deal_fields(session, algo_link)
-            message = self.build_alert_message(title, algo_link, deal)
-            await self.send_message(message)
-            sent_count += 1
+                # 전송은 발송 워커가 맡는다. 여기서는 기록과 적재만 하고 바로 다음 글로 넘어간다
+                products: List[tuple[str, str, str]] = []
+                if previous is None:
+                    if canonical_url:
+                        products.append((canonical_url, post_id, title))
+                elif duplicate_mode == "merge":
+                    messages = self.build_duplicate_messages(post_id, title, algo_link, previous[1], source.label)
+                else:
+                    logging.info("최근 알림과 중복, 생략: %s (이전: %s)", title, previous[1])
+                    messages = []
+                prices = [(observed[0], observed[1], post_id)] if observed else []
+                with stage_span("record"):
+                    await self.repo.record_posts_async([(post_id, title, algo_link)], messages, products, prices)
+                if messages and previous is None and self.near_duplicates is not None:
+                    self.near_duplicates.add(post_id, title, deal.get("content"))
+                if messages:
+                    alerted += 1
+                    POSTS_ALERTED_TOTAL.inc(source.name)
+                    self.outbox.notify()
+        finally:
+            # 오류로 중단되면 남은 상세 조회는 취소 (기록되지 않은 글은 다음 주기에 다시 처리)
+            for task in tasks:
+                if task is not None:
+                    task.cancel()
+
+        return len(new_posts), alerted
 
-            matched_keywords = self.detect_keyword_hits(title, deal)
-            await self.maybe_send_keyword_alert_burst(title, algo_link, deal, matched_keywords)
+    async def poll_source_loop(self, session: aiohttp.ClientSession, source: DealSource) -> None:
+        scheduler = source.scheduler
+        assert scheduler is not None
+        last_saved = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                new_count, alerted = await self.check_source(session, source)
+                scheduler.record_poll(new_count)
+                logging.info("체크 완료 [%s]: 새 글 %d건, 알림 %d건", source.name, new_count, alerted)
+            except HttpStatusError as exc:
+                if exc.status == 429 or exc.status >= 500:
+                    scheduler.record_pushback(exc.retry_after)
+                    logging.warning("[%s] 서버 제한 응답 HTTP %d, 간격 x%.0f", source.name, exc.status, scheduler.backoff)
+                else:
+                    logging.exception("체크 중 오류 [%s]: %s", source.name, exc)
+            except asyncio.TimeoutError:
+                scheduler.record_pushback()
+                logging.warning("[%s] 목록 요청 타임아웃, 간격 x%.0f", source.name, scheduler.backoff)
+            except Exception as exc:
+                logging.exception("체크 중 오류 [%s]: %s", source.name, exc)
 
-            self.repo.add(post_id, title, algo_link)
+            if self.config.adaptive_polling and time.monotonic() - last_saved > RATES_SAVE_INTERVAL_SEC:
+                last_saved = time.monotonic()
+                try:
+                    await self.repo.set_state_async(source.rates_state_key, scheduler.dump())
+                except Exception as exc:
+                    logging.warning("[%s] 도착률 저장 실패: %s", source.name, exc)
+            await asyncio.sleep(scheduler.next_interval(source.interval_sec))
 
-        return sent_count
+    async def prune_loop(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                deleted = await self.repo.prune(
+                    self.config.seen_retention_days * 86400,
+                    self.config.seen_max_rows,
+                    batch_size=self.config.prune_batch_size,
+                    detail_ttl_sec=self.config.detail_cache_ttl_sec if self.config.detail_cache_persist else 0,
+                    product_ttl_sec=self.config.origin_dedup_window_hours * 3600,
+                    price_raw_sec=self.config.price_history_raw_days * 86400,
+                    price_retention_sec=self.config.price_history_retention_days * 86400,
+                )
+                if deleted:
+                    logging.info("DB 정리: %d행 삭제", deleted)
+            except Exception as exc:
+                logging.exception("seen_posts 정리 중 오류: %s", exc)
+            await asyncio.sleep(self.config.prune_interval_sec)
 
     async def run(self) -> None:
         if self.config.startup_test_message:
-            await self.send_message("🔔 [알림] 핫딜 봇이 정상 시작되었습니다. (all 모드 고정)")
+            await self.send_message(f"🔔 [알림] 핫딜 봇이 정상 시작되었습니다. ({self.get_mode()} 모드)")
 
         cli_thread = threading.Thread(target=self.run_console, daemon=True)
         cli_thread.start()
 
         timeout = aiohttp.ClientTimeout(total=self.config.request_timeout_sec)
-        connector = aiohttp.TCPConnector(limit=20, ssl=False)
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=max(source.concurrency for source in self.sources),
+            ssl=False,
+        )
 
-        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
-            while not self.stop_event.is_set():
-                try:
-                    sent = await self.check_once(session)
-                    logging.info("체크 완료: 새 알림 %d건", sent)
-                except Exception as exc:
-                    logging.exception("체크 중 오류: %s", exc)
-                await asyncio.sleep(self.get_interval_sec())
+        metrics_runner = await self.start_metrics_server()
+        prune_task = asyncio.create_task(self.prune_loop())
+        outbox_task = asyncio.create_task(self.outbox.run(self.stop_event))
+        try:
+            # 모든 소스를 하나의 세션에서 각자의 주기로 동시에 폴링
+            async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+                await asyncio.gather(*(self.poll_source_loop(session, source) for source in self.sources))
+        finally:
+            prune_task.cancel()
+            outbox_task.cancel()
+            await asyncio.gather(prune_task, outbox_task, return_exceptions=True)
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            self.parse_pool.close()
+            self.repo.close()
 
 
 def setup_logging() -> None:
@@ -509,9 +4201,12 @@ async def async_main() -> None:
     install_signal_handlers(loop, bot.stop_event)
 
     logging.info(
-        "핫딜 감시 시작 (interval=%ss, dry_run=%s, all_mode=true)",
+        "핫딜 감시 시작 (sources=%s, interval=%ss, dry_run=%s, mode=%s, prefilter=%s)",
+        ",".join(source.name for source in bot.sources),
         config.check_interval_sec,
         config.dry_run,
+        config.mode,
+        config.keyword_prefilter,
     )
     await bot.run()
 